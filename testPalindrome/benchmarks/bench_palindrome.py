@@ -0,0 +1,193 @@
+"""
+palindrome.py 基准测试：覆盖各个 is_palindrome_* 与 palindrome_stats，
+输入长度从 10 字符到 100 MB，区分完整回文 / 首字符即不匹配、ASCII / Unicode 两个维度，
+记录耗时、吞吐量和峰值内存（tracemalloc），结果写成 JSON，可与保存的基线对比找出性能回退
+
+另外对比 is_palindrome_many 与逐个调用同一模式的 is_palindrome_*（大量短字符串），
+批量接口应明显快于循环
+
+用法（在 testPalindrome 目录下）：
+    python benchmarks/bench_palindrome.py -o baseline.json
+    python benchmarks/bench_palindrome.py --max-size 1000000 --baseline baseline.json
+    python benchmarks/bench_palindrome.py --max-size 0 --batch-count 1000000
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.palindrome import (  # noqa: E402
+    is_palindrome_simple,
+    is_palindrome_ignore_case,
+    is_palindrome_with_whitespace,
+    is_palindrome_recursive,
+    is_palindrome_many,
+    palindrome_stats,
+    np,
+)
+
+# 测试输入长度（字符数）
+SIZES = [10, 1_000, 100_000, 10_000_000, 100_000_000]
+
+# palindrome_stats 只在读取字段时计算，这里读取全部字段
+FUNCTIONS = {
+    'is_palindrome_simple': is_palindrome_simple,
+    'is_palindrome_ignore_case': is_palindrome_ignore_case,
+    'is_palindrome_with_whitespace': is_palindrome_with_whitespace,
+    'is_palindrome_recursive': is_palindrome_recursive,
+    'palindrome_stats': lambda text: palindrome_stats(text).to_dict(),
+}
+
+# 构造输入用的字符表：都包含大小写、空白和标点，使各个清洗模式都有实际工作量
+ALPHABETS = {
+    'ascii': "Ab, c.D e",
+    'unicode': "上海Ab，自来水é Å",
+}
+
+# 批量对比：各模式对应的单个检查函数，以及构造短字符串用的单词
+BATCH_MODES = {
+    'simple': is_palindrome_simple,
+    'ignore_case': is_palindrome_ignore_case,
+    'with_whitespace': is_palindrome_with_whitespace,
+}
+BATCH_WORDS = ["racecar", "Level", "hello", "abba", "Never odd or even", "x", "上海自来水来自海上"]
+BATCH_COUNT = 100_000
+
+# 耗时超过基线的该倍数即视为性能回退
+DEFAULT_THRESHOLD = 1.25
+
+
+def make_inputs(size: int, alphabet: str):
+    # 完整回文（逐字符镜像，各模式下都是回文）与首字符即不匹配的输入
+    half = (alphabet * (size // (2 * len(alphabet)) + 1))[:size // 2]
+    palindrome = half + "x" * (size % 2) + half[::-1]
+    return {'palindrome': palindrome, 'early_mismatch': "z" + palindrome[1:]}
+
+
+def time_call(func, text: str, repeat: int) -> float:
+    # 返回单次调用的最短平均耗时（秒）
+    timer = timeit.Timer(lambda: func(text))
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def peak_memory(func, text: str) -> int:
+    # 单次调用期间新分配内存的峰值（字节），不含输入本身
+    tracemalloc.start()
+    try:
+        func(text)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def run_benchmark(sizes, functions, alphabets, repeat: int = 3, log=sys.stderr):
+    results = []
+    for alphabet in alphabets:
+        for size in sizes:
+            for shape, text in make_inputs(size, ALPHABETS[alphabet]).items():
+                for name in functions:
+                    func = FUNCTIONS[name]
+                    seconds = time_call(func, text, repeat)
+                    result = {
+                        'function': name,
+                        'alphabet': alphabet,
+                        'size': size,
+                        'shape': shape,
+                        'seconds': seconds,
+                        'chars_per_second': size / seconds if seconds else None,
+                        'peak_bytes': peak_memory(func, text),
+                    }
+                    results.append(result)
+                    print(f"{name:>30} {alphabet:>8} {size:>11} {shape:>15} "
+                          f"{seconds * 1e6:14.2f}us {result['peak_bytes']:>12}B", file=log)
+    return results
+
+
+def run_batch_benchmark(count: int, repeat: int = 3, log=sys.stderr):
+    # 对比 is_palindrome_many 与逐个调用的耗时（各取 repeat 次中最短的一次）
+    texts = [BATCH_WORDS[i % len(BATCH_WORDS)] for i in range(count)]
+    results = []
+    for mode, checker in BATCH_MODES.items():
+        loop = min(timeit.repeat(lambda: [checker(text) for text in texts], repeat=repeat, number=1))
+        batch = min(timeit.repeat(lambda: is_palindrome_many(texts, mode=mode), repeat=repeat, number=1))
+        results.append({'mode': mode, 'count': count, 'loop_seconds': loop,
+                        'batch_seconds': batch, 'speedup': loop / batch if batch else None})
+        print(f"{'is_palindrome_many':>30} {mode:>16} {count:>9} "
+              f"loop {loop:8.3f}s batch {batch:8.3f}s x{loop / batch:.2f}", file=log)
+    return results
+
+
+def _key(result):
+    return result['function'], result['alphabet'], result['size'], result['shape']
+
+
+def compare(results, baseline, threshold: float = DEFAULT_THRESHOLD):
+    # 返回耗时超过基线 threshold 倍的结果：[(result, 相对基线的倍数), ...]
+    previous = {_key(result): result for result in baseline['results']}
+    regressions = []
+    for result in results:
+        old = previous.get(_key(result))
+        if old and old['seconds'] > 0:
+            ratio = result['seconds'] / old['seconds']
+            if ratio > threshold:
+                regressions.append((result, ratio))
+    return regressions
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="palindrome.py 基准测试")
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES, help="输入长度列表")
+    parser.add_argument('--max-size', type=int, help="跳过超过该长度的输入")
+    parser.add_argument('--functions', nargs='+', choices=sorted(FUNCTIONS), default=list(FUNCTIONS))
+    parser.add_argument('--alphabets', nargs='+', choices=sorted(ALPHABETS), default=list(ALPHABETS))
+    parser.add_argument('--repeat', type=int, default=3, help="每项计时重复次数")
+    parser.add_argument('--batch-count', type=int, default=BATCH_COUNT,
+                        help="批量对比使用的字符串数量（0 表示跳过）")
+    parser.add_argument('-o', '--output', help="结果 JSON 文件（默认输出到标准输出）")
+    parser.add_argument('--baseline', help="用于对比的基线 JSON 文件")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="耗时超过基线的倍数阈值")
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    sizes = [size for size in args.sizes if args.max_size is None or size <= args.max_size]
+    report = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'numpy': np is not None,
+        'results': run_benchmark(sizes, args.functions, args.alphabets, args.repeat),
+    }
+    if args.batch_count > 0:
+        report['batch'] = run_batch_benchmark(args.batch_count, args.repeat)
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as file:
+            baseline = json.load(file)
+        regressions = compare(report['results'], baseline, args.threshold)
+        for result, ratio in regressions:
+            print(f"性能回退: {result['function']} {result['alphabet']} {result['size']} "
+                  f"{result['shape']} 耗时为基线的 {ratio:.2f} 倍", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,56 @@
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.palindrome import is_palindrome_simple, is_palindrome_recursive  # noqa: E402
+
+# 测试输入长度（旧版逐字符递归在约 2000 字符以上会触发 RecursionError）
+SIZES = [10, 100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000]
+
+
+def legacy_recursive(text: str) -> bool:
+    # 旧版实现：每对字符递归一层，仅作对比
+    def _is_palindrome(s: str, start: int, end: int) -> bool:
+        if start >= end:
+            return True
+        if s[start] == s[end]:
+            return _is_palindrome(s, start + 1, end - 1)
+        return False
+
+    return _is_palindrome(text, 0, len(text) - 1)
+
+
+def make_inputs(size: int):
+    # 完整回文与首字符即不匹配的输入
+    half = ("abc" * (size // 6 + 1))[:size // 2]
+    palindrome = half + "x" * (size % 2) + half[::-1]
+    return {"palindrome": palindrome, "early_mismatch": "z" + palindrome[1:]}
+
+
+def time_call(func, text: str) -> float:
+    # 返回单次调用的平均耗时（微秒）
+    timer = timeit.Timer(lambda: func(text))
+    number, _ = timer.autorange()
+    best = min(timer.repeat(repeat=3, number=number))
+    return best / number * 1e6
+
+
+def run_benchmark():
+    print("=" * 72)
+    print(f"{'size':>10} {'input':>15} {'simple(us)':>12} {'recursive(us)':>14} {'legacy(us)':>12}")
+    print("=" * 72)
+    for size in SIZES:
+        for name, text in make_inputs(size).items():
+            simple_cost = time_call(is_palindrome_simple, text)
+            recursive_cost = time_call(is_palindrome_recursive, text)
+            try:
+                legacy_cost = f"{time_call(legacy_recursive, text):12.2f}"
+            except RecursionError:
+                legacy_cost = f"{'RecursionError':>12}"
+            print(f"{size:>10} {name:>15} {simple_cost:12.2f} {recursive_cost:14.2f} {legacy_cost}")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -1,83 +1,1817 @@
+import heapq
+import mmap
+import os
+import random
+import re
+import unicodedata
+from array import array
+from bisect import bisect_left
+from enum import IntFlag
+from functools import lru_cache
+from itertools import islice
+
+try:
+    import numpy as np
+except ImportError:  # numpy 为可选依赖，缺失时批量接口退化为逐个检查
+    np = None
+
+# 判断模式（与 is_palindrome_simple / ignore_case / with_whitespace / recursive 一一对应）
+PALINDROME_MODES = ('simple', 'ignore_case', 'with_whitespace', 'recursive')
+
+# 清洗方式：ascii 为原有规则（str.lower，只保留 ASCII 字母数字），
+# unicode 为 NFKC + casefold，保留所有 Unicode 字母数字
+NORMALIZATIONS = ('ascii', 'unicode')
+
+# 非字母数字字符（is_palindrome_with_whitespace 的清洗规则）
+_NON_ALNUM_PATTERN = re.compile(r'[^a-zA-Z0-9]')
+
+# 导入时预先构建的删除表：删除所有 ASCII 字母数字以外的字节
+_NON_ALNUM_BYTES = bytes(byte for byte in range(256) if not (byte < 128 and chr(byte).isalnum()))
+
+# Unicode 模式下的非字母数字字符（\w 即 str.isalnum() 加下划线）
+_UNICODE_NON_ALNUM_PATTERN = re.compile(r'[\W_]+')
+
+# 批量清洗时多条字符串以 \x00 连接；以下删除表 / 正则与上面相同，但保留分隔符
+_BATCH_SEPARATOR = '\x00'
+_NON_ALNUM_BYTES_KEEP_SEPARATOR = _NON_ALNUM_BYTES.replace(b'\x00', b'')
+_UNICODE_NON_ALNUM_KEEP_SEPARATOR = re.compile(r'(?:[^\w\x00]|_)+')
+
+# 双指针引擎每次从一端读取的字符数
+_MIRROR_BLOCK_SIZE = 4096
+
+# 文件逐块转小写时为 Σ 预读的初始上下文字节数（不够时按 4 倍扩大）
+_CASE_CONTEXT = 64
+
+# 一定不是 case-ignorable 的字符类别（字母、数字、空白、控制字符），Σ 向两侧查找上下文时在此停止
+_CASE_BOUNDARY_CATEGORIES = frozenset(('Lu', 'Ll', 'Lt', 'Lo', 'Nd', 'Zs', 'Zl', 'Zp', 'Cc'))
+
+# 规范组合中可以作为第二个字符、与前面的起始字符组合的 Hangul 元音 (V) 和收音 (T)
+_HANGUL_COMBINING_JAMO = (range(0x1161, 0x1176), range(0x11A8, 0x11C3))
+
+
+def _identity(chunk):
+    return chunk
+
+
+def _fold_alnum(chunk: str) -> str:
+    # 转小写并只保留 ASCII 字母数字字符（按字节删除表处理，等价于 [^a-zA-Z0-9] 替换）
+    return chunk.lower().encode('ascii', 'ignore').translate(None, _NON_ALNUM_BYTES).decode('ascii')
+
+
+def _fold_bytes_lower(chunk) -> bytes:
+    # 字节输入：只折叠 ASCII 大小写
+    return bytes(chunk).lower()
+
+
+def _fold_bytes_alnum(chunk) -> bytes:
+    # 字节输入：折叠 ASCII 大小写并只保留 ASCII 字母数字
+    return bytes(chunk).lower().translate(None, _NON_ALNUM_BYTES)
+
+
+def _fold_unicode(chunk: str) -> str:
+    # casefold 后做 NFKC 兼容分解再组合（全角、连字、预组合字符统一为同一形式）
+    return unicodedata.normalize('NFKC', chunk.casefold())
+
+
+def _fold_unicode_alnum(chunk: str) -> str:
+    # Unicode 模式下只保留字母数字字符；纯 ASCII 片段与 ASCII 规则等价，走删除表快速路径
+    if chunk.isascii():
+        return _fold_alnum(chunk)
+    return _UNICODE_NON_ALNUM_PATTERN.sub('', _fold_unicode(chunk))
+
+
+# 以下 _fold_joined_* 对以 \x00 连接的多条字符串整体清洗，返回同样以 \x00 连接的结果
+# （\x00 不是 cased / case-ignorable 字符，也不参与 NFKC 组合，整体清洗与逐条清洗结果相同）
+
+def _fold_joined_alnum(joined: str) -> bytes:
+    # 返回 bytes（只含 ASCII 字母数字和分隔符）
+    return joined.lower().encode('ascii', 'ignore').translate(None, _NON_ALNUM_BYTES_KEEP_SEPARATOR)
+
+
+def _fold_joined_unicode_alnum(joined: str) -> str:
+    return _UNICODE_NON_ALNUM_KEEP_SEPARATOR.sub('', _fold_unicode(joined))
+
+
+def _as_text(text):
+    """
+    校验输入类型：str 原样返回；bytes / bytearray / memoryview 等支持缓冲区协议的对象
+    返回按字节索引的一维 memoryview，不复制数据
+    """
+    if isinstance(text, str):
+        return text
+    try:
+        view = memoryview(text)
+    except TypeError:
+        raise TypeError("输入必须是字符串或字节序列") from None
+    if view.ndim != 1 or view.format != 'B':
+        view = view.cast('B')
+    return view
+
+
+def _is_case_boundary(char: str) -> bool:
+    # 该字符一定不是 case-ignorable 的
+    return unicodedata.category(char) in _CASE_BOUNDARY_CATEGORIES
+
+
+def _case_context(text: str, lo: int, hi: int):
+    """
+    text[lo:hi] 逐块转小写所需的上下文范围 (left, right)
+    Σ 的小写形式取决于两侧跳过任意多个 case-ignorable 字符后的第一个字符，
+    只有片段边缘最近的边界字符是 Σ 时才需要越过 lo / hi 向外查找；
+    查找到 text 开头（结尾）仍未遇到边界字符时 left 为 -1（right 为 len(text) + 1）
+    """
+    left, right = lo, hi
+    first = lo
+    while first < hi and not _is_case_boundary(text[first]):
+        first += 1
+    if first == hi:
+        # 片段中没有边界字符，也就没有 Σ
+        return left, right
+    if text[first] == 'Σ':
+        left = lo - 1
+        while left >= 0 and not _is_case_boundary(text[left]):
+            left -= 1
+    last = hi - 1
+    while not _is_case_boundary(text[last]):
+        last -= 1
+    if text[last] == 'Σ':
+        while right < len(text) and not _is_case_boundary(text[right]):
+            right += 1
+        right += 1
+    return left, right
+
+
+def _lower_window(text: str, lo: int, hi: int, left: int, right: int) -> str:
+    # 连同 text[left:lo] 和 text[hi:right] 两段上下文一起转小写，再去掉上下文部分
+    # （str.lower() 输出长度与上下文无关，可按长度截取）
+    lowered = text[left:right].lower()
+    start = len(text[left:lo].lower())
+    stop = len(lowered) - len(text[hi:right].lower())
+    return lowered[start:stop]
+
+
+def _lower_in_context(text: str, lo: int, hi: int) -> str:
+    # text[lo:hi] 转小写，结果与 text.lower() 中对应的部分相同
+    left, right = _case_context(text, lo, hi)
+    return _lower_window(text, lo, hi, max(left, 0), min(right, len(text)))
+
+
+def _iter_mirror_blocks(text: str, fold=None, strip: bool = False, block_size: int = None,
+                        align=None, windowed: bool = False):
+    """
+    双指针引擎：从两端按块向中间推进，依次产出等长的 (左侧片段, 右侧片段逆序)
+    所有片段两两相等 <=> fold(text)（strip=True 时再去掉首尾空白）是回文
+    fold 逐块作用，只缓冲常数个块，不生成整个清洗后的字符串
+    align(pos, lower, upper) 将切分位置调整到 (lower, upper) 内的合法边界（如 UTF-8 字符边界），
+    返回 None 表示中段没有合法的切分位置，此时一次读完中段
+    windowed=True 时 fold 以 fold(text, lo, hi) 调用，可以读取片段以外的上下文
+    """
+    if block_size is None:
+        block_size = _MIRROR_BLOCK_SIZE
+    if fold is None:
+        fold = _identity
+    total = len(text)
+
+    def read(lo: int, hi: int):
+        if windowed:
+            return fold(text, lo, hi)
+        return fold(text[lo:hi])
+
+    start, end = 0, total
+    # right 中保存右侧已读取内容的逆序
+    left = right = read(0, 0)
+    left_started = right_started = not strip
+
+    # 总是补充较短的一侧，两侧缓冲的长度差不超过一个块
+    while end - start >= block_size:
+        if len(left) <= len(right):
+            cut = start + block_size
+            if align is not None:
+                # 调整后必须仍有进展，且不能越过右侧已读取的部分
+                cut = align(cut, start, end)
+                if cut is None:
+                    cut = end
+                elif not start < cut <= end:
+                    cut = start + block_size
+            left += read(start, cut)
+            start = cut
+            if not left_started:
+                left = left.lstrip()
+                left_started = bool(left)
+        else:
+            cut = end - block_size
+            if align is not None:
+                cut = align(cut, start, end)
+                if cut is None:
+                    cut = start
+                elif not start <= cut < end:
+                    cut = end - block_size
+            right += read(cut, end)[::-1]
+            end = cut
+            if not right_started:
+                right = right.lstrip()
+                right_started = bool(right)
+
+        size = min(len(left), len(right))
+        if size:
+            yield left[:size], right[:size]
+            left, right = left[size:], right[size:]
+
+    # 剩余部分：左缓冲 + 中段 + 右缓冲（恢复正序）
+    rest = left + read(start, end) + right[::-1]
+    if not left_started:
+        rest = rest.lstrip()
+    if not right_started:
+        rest = rest.rstrip()
+    half = len(rest) // 2
+    if half:
+        yield rest[:half], rest[::-1][:half]
+
+
+def _mirror_equal(text: str, fold=None, strip: bool = False, block_size: int = None,
+                  align=None, windowed: bool = False) -> bool:
+    # 逐块比较，遇到第一处不匹配立即返回
+    blocks = _iter_mirror_blocks(text, fold, strip, block_size, align, windowed)
+    return all(left == right for left, right in blocks)
+
+
+@lru_cache(maxsize=None)
+def _composition_seconds() -> frozenset:
+    # 规范组合中作为第二个字符出现的所有字符（首次使用时扫描 Unicode 数据库构建；
+    # 二字符的规范分解只出现在 BMP 和第 1 平面，其余平面只有单字符的兼容表意文字）
+    seconds = set()
+    for code in range(0x20000):
+        parts = unicodedata.decomposition(chr(code)).split()
+        if len(parts) == 2 and not parts[0].startswith('<'):
+            seconds.add(chr(int(parts[1], 16)))
+    for jamo in _HANGUL_COMBINING_JAMO:
+        seconds.update(map(chr, jamo))
+    return frozenset(seconds)
+
+
+@lru_cache(maxsize=4096)
+def _is_safe_cut_char(char: str) -> bool:
+    """
+    在该字符之前切分不影响 casefold + NFKC 的结果：
+    casefold 后完全分解的第一个字符是组合类为 0 的起始字符，且不会与前面的起始字符组合
+    （半角浊音符 ﾞ 分解为组合字符，Hangul 的 V / T 字母会与前面的字母组合，都不安全）
+    """
+    if char < '\x80':
+        return True
+    first = unicodedata.normalize('NFKD', char.casefold())[0]
+    return unicodedata.combining(first) == 0 and first not in _composition_seconds()
+
+
+def _find_safe_cut(is_safe, pos: int, lower: int, upper: int):
+    # 在 (lower, upper) 内寻找离 pos 最近的安全切分位置，先向前、再向后；找不到时返回 None
+    for cut in range(min(pos, upper - 1), lower, -1):
+        if is_safe(cut):
+            return cut
+    for cut in range(pos + 1, upper):
+        if is_safe(cut):
+            return cut
+    return None
+
+
+def _unicode_aligner(text: str):
+    # Unicode 模式下把切分位置调整到安全字符之前，避免 NFKC 跨块组合或重排字符
+    def align(pos, lower, upper):
+        return _find_safe_cut(lambda cut: _is_safe_cut_char(text[cut]), pos, lower, upper)
+    return align
+
+
+class Normalizer:
+    """
+    一种清洗规则：fold 逐块转换字符串，strip 表示再去掉首尾空白
+    导入时按 (模式, 清洗方式) 预先构建，由 get_normalizer() 获取，所有 is_palindrome_* 函数共用
+    """
+
+    __slots__ = ('mode', 'normalization', 'fold', 'strip', 'byte_fold', 'context_fold',
+                 'safe_cuts', 'joined_fold')
+
+    def __init__(self, mode: str, normalization: str, fold=None, strip: bool = False,
+                 byte_fold=None, context_fold=None, safe_cuts: bool = False, joined_fold=None):
+        self.mode = mode
+        self.normalization = normalization
+        self.fold = fold
+        self.strip = strip
+        # 字节输入使用的 fold（只做 ASCII 大小写折叠），为 None 表示不支持字节输入
+        self.byte_fold = byte_fold
+        # 逐块转换依赖 Σ 上下文时使用的 fold(text, lo, hi)
+        self.context_fold = context_fold
+        # 是否需要在安全位置切块（NFKC 会组合相邻字符）
+        self.safe_cuts = safe_cuts
+        # 批量接口使用的 fold：整体清洗以 \x00 连接的多条字符串（strip 由批量比较逐条处理）
+        self.joined_fold = joined_fold
+
+    def __repr__(self) -> str:
+        return f"Normalizer({self.mode!r}, {self.normalization!r})"
+
+    def _check_bytes_supported(self):
+        if self.byte_fold is None:
+            raise ValueError(f"{self.normalization} 清洗方式不支持字节输入")
+
+    def __call__(self, text):
+        # 整体清洗，返回完整的清洗结果（字节输入返回 bytes）
+        if isinstance(text, memoryview):
+            self._check_bytes_supported()
+            cleaned = self.byte_fold(text)
+        else:
+            cleaned = text if self.fold is None else self.fold(text)
+        return cleaned.strip() if self.strip else cleaned
+
+    def blocks(self, text):
+        # 双指针引擎的镜像块序列，不生成完整的清洗结果；text 为 str 或按字节索引的 memoryview
+        if isinstance(text, memoryview):
+            self._check_bytes_supported()
+            return _iter_mirror_blocks(text, self.byte_fold, self.strip)
+        if self.context_fold is not None and 'Σ' in text:
+            return _iter_mirror_blocks(text, self.context_fold, self.strip, windowed=True)
+        align = _unicode_aligner(text) if self.safe_cuts else None
+        return _iter_mirror_blocks(text, self.fold, self.strip, align=align)
+
+    def is_palindrome(self, text) -> bool:
+        # 短输入整体清洗后直接比较；长输入逐块比较，遇到第一处不匹配立即返回
+        if len(text) <= _MIRROR_BLOCK_SIZE:
+            cleaned = self(text)
+            return cleaned == cleaned[::-1]
+        return all(left == right for left, right in self.blocks(text))
+
+
+def _build_normalizers() -> dict:
+    normalizers = {}
+    for normalization in NORMALIZATIONS:
+        for mode in ('simple', 'recursive'):
+            normalizers[mode, normalization] = Normalizer(mode, normalization, byte_fold=bytes)
+    normalizers['ignore_case', 'ascii'] = Normalizer(
+        'ignore_case', 'ascii', str.lower, strip=True, byte_fold=_fold_bytes_lower,
+        context_fold=_lower_in_context, joined_fold=str.lower)
+    normalizers['with_whitespace', 'ascii'] = Normalizer(
+        'with_whitespace', 'ascii', _fold_alnum, byte_fold=_fold_bytes_alnum,
+        joined_fold=_fold_joined_alnum)
+    normalizers['ignore_case', 'unicode'] = Normalizer(
+        'ignore_case', 'unicode', _fold_unicode, strip=True, safe_cuts=True,
+        joined_fold=_fold_unicode)
+    normalizers['with_whitespace', 'unicode'] = Normalizer(
+        'with_whitespace', 'unicode', _fold_unicode_alnum, safe_cuts=True,
+        joined_fold=_fold_joined_unicode_alnum)
+    return normalizers
+
+
+_NORMALIZERS = _build_normalizers()
+
+
+def get_normalizer(mode: str = 'simple', normalization: str = 'ascii') -> Normalizer:
+    """
+    获取预先构建的清洗规则
+    Examples:
+        >>> get_normalizer('with_whitespace', 'unicode')("Ｒacé, éCAR!")
+        'racéécar'
+    """
+    if mode not in PALINDROME_MODES:
+        raise ValueError(f"不支持的模式: {mode}")
+    if normalization not in NORMALIZATIONS:
+        raise ValueError(f"不支持的清洗方式: {normalization}")
+    return _NORMALIZERS[mode, normalization]
+
+
 def is_palindrome_simple(text: str) -> bool:
     """
     简单判断是否为回文（区分大小写）
+    也接受 bytes / bytearray / memoryview，按字节比较且不复制整个缓冲区
     Examples:
         >>> is_palindrome_simple("racecar")
         True
-        >>> is_palindrome_simple("hello")
+        >>> is_palindrome_simple(b"hello")
         False
     """
-    if not isinstance(text, str):
-        raise TypeError("输入必须是字符串")
+    text = _as_text(text)
 
     # 空字符串和单个字符都是回文
     if len(text) <= 1:
         return True
 
+    # 字节输入逐块比较，只复制常数大小的块
+    if isinstance(text, memoryview):
+        return get_normalizer('simple').is_palindrome(text)
+
     # 使用切片反转字符串进行比较
     return text == text[::-1]
 
 
-def is_palindrome_ignore_case(text: str) -> bool:
-    # 忽略大小写判断是否为回文
-    if not isinstance(text, str):
-        raise TypeError("输入必须是字符串")
+def is_palindrome_ignore_case(text: str, normalization: str = 'ascii') -> bool:
+    # 忽略大小写判断是否为回文（normalization='unicode' 时使用 casefold + NFKC）
+    # 字节输入只折叠 ASCII 大小写
+    text = _as_text(text)
 
-    # 转换为小写并移除空白
-    cleaned = text.lower().strip()
-    if len(cleaned) <= 1:
-        return True
+    # 逐块转换为小写并移除首尾空白，首尾不匹配时立即返回
+    return get_normalizer('ignore_case', normalization).is_palindrome(text)
 
-    return cleaned == cleaned[::-1]
 
+def is_palindrome_with_whitespace(text: str, normalization: str = 'ascii') -> bool:
+    # 忽略空格和标点判断是否为回文（normalization='unicode' 时保留所有 Unicode 字母数字）
+    # 字节输入只保留 ASCII 字母数字
+    text = _as_text(text)
 
-def is_palindrome_with_whitespace(text: str) -> bool:
-    # 忽略空格和标点判断是否为回文
-    if not isinstance(text, str):
-        raise TypeError("输入必须是字符串")
+    # 逐块只保留字母数字字符并转换为小写
+    return get_normalizer('with_whitespace', normalization).is_palindrome(text)
 
-    import re
-    # 只保留字母数字字符并转换为小写
-    cleaned = re.sub(r'[^a-zA-Z0-9]', '', text.lower())
 
-    if len(cleaned) <= 1:
-        return True
+def is_palindrome_recursive(text: str) -> bool:
+    # 使用递归方法判断是否为回文
+    # 采用分治递归：每层把待比较的首尾区间对半拆分，递归深度为 O(log n)，任意长度都不会栈溢出
+    text = _as_text(text)
 
-    return cleaned == cleaned[::-1]
+    leaf_size = _MIRROR_BLOCK_SIZE
+    # 字节输入在叶子处复制成 bytes 再比较（memoryview 逐元素比较较慢）
+    piece = bytes if isinstance(text, memoryview) else _identity
+    if len(text) <= leaf_size:
+        return piece(text) == piece(text)[::-1]
 
+    def _is_mirrored(start: int, end: int, size: int) -> bool:
+        """递归辅助函数：text[start:start+size] 是否等于 text[end-size:end] 的逆序"""
+        # 基本情况：区间足够小时直接切片比较
+        if size <= leaf_size:
+            return piece(text[start:start + size]) == piece(text[end - size:end])[::-1]
 
-def is_palindrome_recursive(text: str) -> bool:
-    # 使用递归方法判断是否为回文
-    if not isinstance(text, str):
-        raise TypeError("输入必须是字符串")
+        # 先比较靠外的一半，首尾不匹配时尽早返回
+        half = size // 2
+        return (_is_mirrored(start, end, half)
+                and _is_mirrored(start + half, end - half, size - half))
 
-    def _is_palindrome(s: str, start: int, end: int) -> bool:
-        """递归辅助函数"""
-        # 基本情况
-        if start >= end:
+    return _is_mirrored(0, len(text), len(text) // 2)
+
+
+def _analyze_flags(text: str) -> dict:
+    """
+    单次遍历同时计算 simple / ignore_case / with_whitespace 三个标志
+    三个镜像块序列交替推进，各自在首个不匹配处退出
+    原串或忽略大小写后是回文时，只保留字母数字后必然也是回文，可直接得出结论
+    """
+    pending = {
+        'simple': get_normalizer('simple').blocks(text),
+        'ignore_case': get_normalizer('ignore_case').blocks(text),
+        'with_whitespace': get_normalizer('with_whitespace').blocks(text),
+    }
+    flags = {}
+    while pending:
+        for name, blocks in list(pending.items()):
+            pair = next(blocks, None)
+            if pair is None or pair[0] != pair[1]:
+                flags[name] = pair is None
+                del pending[name]
+        if 'with_whitespace' in pending and (flags.get('simple') or flags.get('ignore_case')):
+            flags['with_whitespace'] = True
+            del pending['with_whitespace']
+    return flags
+
+
+def _short_flags(text: str) -> dict:
+    # 短输入直接整体比较（各模式的 is_palindrome 对短输入只清洗一次），不交替推进块序列
+    # 原串是回文时忽略大小写后不一定是回文（"ΣΑΣ" 的末尾 Σ 转为 ς），只能推出 with_whitespace
+    simple = text == text[::-1]
+    ignore_case = get_normalizer('ignore_case').is_palindrome(text)
+    with_whitespace = simple or ignore_case or get_normalizer('with_whitespace').is_palindrome(text)
+    return {'simple': simple, 'ignore_case': ignore_case, 'with_whitespace': with_whitespace}
+
+
+def _filled(method):
+    # 先补齐 PalindromeStats 的全部字段，再调用 dict 的同名方法
+    def wrapper(self, *args, **kwargs):
+        self._fill()
+        return method(self, *args, **kwargs)
+    wrapper.__name__ = method.__name__
+    return wrapper
+
+
+class PalindromeStats(dict):
+    """
+    palindrome_stats 的返回值，是 dict 的子类（可以修改，可以直接 json.dumps）
+    不超过 _MIRROR_BLOCK_SIZE 的短输入在构建时直接算出全部字段；
+    长输入的回文标志在首次读取任一标志时一次性计算，reversed 单独读取时每次生成，不额外保存副本；
+    迭代、比较、json.dumps 等需要全部字段的操作会先补齐所有字段，之后与普通 dict 相同
+    """
+
+    __slots__ = ('_text', '_flags')
+
+    KEYS = ('original', 'length', 'simple', 'ignore_case', 'with_whitespace',
+            'recursive', 'reversed', 'is_empty', 'is_single_char')
+
+    # 按需计算、尚未写入 dict 的字段
+    _LAZY_KEYS = frozenset(('simple', 'ignore_case', 'with_whitespace', 'recursive', 'reversed'))
+
+    def __init__(self, text: str, original=None):
+        # text 为 str 或按字节索引的 memoryview；original 为写入结果的原输入，默认为 text
+        if original is None:
+            original = text
+        length = len(text)
+        if length <= _MIRROR_BLOCK_SIZE:
+            flags = _short_flags(text)
+            super().__init__(original=original, length=length, simple=flags['simple'],
+                             ignore_case=flags['ignore_case'],
+                             with_whitespace=flags['with_whitespace'],
+                             recursive=flags['simple'], reversed=self._reverse(text),
+                             is_empty=length == 0, is_single_char=length == 1)
+            self._text = None
+            self._flags = flags
+            return
+        super().__init__(original=original, length=length, is_empty=False, is_single_char=False)
+        # 补齐全部字段后 _text 置为 None
+        self._text = text
+        self._flags = None
+
+    @staticmethod
+    def _reverse(text):
+        # 字节输入返回 bytes，而不是 memoryview
+        return bytes(text[::-1]) if isinstance(text, memoryview) else text[::-1]
+
+    def _get_flags(self) -> dict:
+        if self._flags is None:
+            self._flags = _analyze_flags(self._text)
+        return self._flags
+
+    def __missing__(self, key):
+        if self._text is None or key not in self._LAZY_KEYS:
+            raise KeyError(key)
+        text = self._text
+        if key == 'reversed':
+            return self._reverse(text)
+        if key == 'recursive':
+            # 递归判断与简单判断的语义相同
+            return self._get_flags()['simple']
+        return self._get_flags()[key]
+
+    def _fill(self):
+        # 把按需计算的字段写入 dict，并按 KEYS 的顺序排列（之后写入的键排在后面）
+        if self._text is None:
+            return
+        values = {key: self[key] for key in self.KEYS if key in self}
+        extra = {key: value for key, value in dict.items(self) if key not in values}
+        self._text = None
+        dict.clear(self)
+        dict.update(self, values)
+        dict.update(self, extra)
+
+    def __contains__(self, key) -> bool:
+        return dict.__contains__(self, key) or (self._text is not None and key in self._LAZY_KEYS)
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def clear(self):
+        # 清空后不再补算按需字段
+        self._text = self._flags = None
+        dict.clear(self)
+
+    __iter__ = _filled(dict.__iter__)
+    __len__ = _filled(dict.__len__)
+    __reversed__ = _filled(dict.__reversed__)
+    __delitem__ = _filled(dict.__delitem__)
+    __or__ = _filled(dict.__or__)
+    __ror__ = _filled(dict.__ror__)
+    keys = _filled(dict.keys)
+    values = _filled(dict.values)
+    items = _filled(dict.items)
+    copy = _filled(dict.copy)
+    pop = _filled(dict.pop)
+    popitem = _filled(dict.popitem)
+    setdefault = _filled(dict.setdefault)
+
+    def __eq__(self, other):
+        self._fill()
+        if isinstance(other, PalindromeStats):
+            other._fill()
+        return dict.__eq__(self, other)
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    def __repr__(self) -> str:
+        self._fill()
+        return f"PalindromeStats({dict.__repr__(self)})"
+
+    def __reduce__(self):
+        # 序列化为补齐后的普通 dict 内容
+        self._fill()
+        return _restore_stats, (dict(self),)
+
+    def to_dict(self) -> dict:
+        # 转换为普通 dict（会计算全部字段）
+        self._fill()
+        return dict(self)
+
+    def compact(self) -> 'CompactPalindromeStats':
+        # 转换为不引用原字符串的紧凑表示
+        flags = {key: self[key] for key in ('simple', 'ignore_case', 'with_whitespace')}
+        return CompactPalindromeStats(self['length'], _pack_flags(flags, self['length']))
+
+
+def _restore_stats(values: dict) -> PalindromeStats:
+    # 反序列化：字段都已补齐，不再需要原输入
+    stats = PalindromeStats.__new__(PalindromeStats)
+    dict.update(stats, values)
+    stats._text = stats._flags = None
+    return stats
+
+
+class PalindromeFlag(IntFlag):
+    # 回文统计中的布尔字段，按位打包进一个整数
+    SIMPLE = 1
+    IGNORE_CASE = 2
+    WITH_WHITESPACE = 4
+    RECURSIVE = 8
+    EMPTY = 16
+    SINGLE_CHAR = 32
+
+
+# 统计字段名与标志位的对应关系
+_FLAG_FIELDS = (
+    ('simple', PalindromeFlag.SIMPLE),
+    ('ignore_case', PalindromeFlag.IGNORE_CASE),
+    ('with_whitespace', PalindromeFlag.WITH_WHITESPACE),
+    ('recursive', PalindromeFlag.RECURSIVE),
+    ('is_empty', PalindromeFlag.EMPTY),
+    ('is_single_char', PalindromeFlag.SINGLE_CHAR),
+)
+
+
+def _pack_flags(flags: dict, length: int) -> int:
+    # 把 _analyze_flags 的结果和长度相关字段打包成一个整数
+    packed = 0
+    if flags['simple']:
+        packed |= PalindromeFlag.SIMPLE | PalindromeFlag.RECURSIVE
+    if flags['ignore_case']:
+        packed |= PalindromeFlag.IGNORE_CASE
+    if flags['with_whitespace']:
+        packed |= PalindromeFlag.WITH_WHITESPACE
+    if length == 0:
+        packed |= PalindromeFlag.EMPTY
+    elif length == 1:
+        packed |= PalindromeFlag.SINGLE_CHAR
+    return int(packed)
+
+
+class CompactPalindromeStats:
+    """
+    紧凑的回文统计结果：只保存长度和一个按位打包的标志整数，不保存字符串副本
+    Examples:
+        >>> stats = CompactPalindromeStats.from_text("Level")
+        >>> stats['ignore_case'], stats['simple']
+        (True, False)
+    """
+
+    __slots__ = ('length', 'flags')
+
+    def __init__(self, length: int, flags: int):
+        self.length = length
+        self.flags = flags
+
+    @classmethod
+    def from_text(cls, text: str) -> 'CompactPalindromeStats':
+        text = _as_text(text)
+        return cls(len(text), _pack_flags(_analyze_flags(text), len(text)))
+
+    def __getitem__(self, key):
+        if key == 'length':
+            return self.length
+        for name, flag in _FLAG_FIELDS:
+            if name == key:
+                return bool(self.flags & flag)
+        raise KeyError(key)
+
+    def __eq__(self, other):
+        if not isinstance(other, CompactPalindromeStats):
+            return NotImplemented
+        return self.length == other.length and self.flags == other.flags
+
+    def __repr__(self) -> str:
+        return f"CompactPalindromeStats(length={self.length}, flags={PalindromeFlag(self.flags)!r})"
+
+    def to_dict(self, text: str = None) -> dict:
+        # 导出为 palindrome_stats 格式的 dict；提供原字符串时一并补上 original / reversed
+        result = {'length': self.length}
+        result.update((name, bool(self.flags & flag)) for name, flag in _FLAG_FIELDS)
+        if text is not None:
+            result['original'] = text
+            result['reversed'] = text[::-1]
+        return result
+
+
+class PalindromeStatsArray:
+    """
+    按列存储大量回文统计结果：长度和标志分别存放在连续的 array 中
+    每条记录只占 9 个字节，需要时再导出为 CompactPalindromeStats 或 dict
+    """
+
+    def __init__(self, texts=None):
+        self._lengths = array('Q')
+        self._flags = array('B')
+        if texts is not None:
+            self.extend(texts)
+
+    def append(self, text: str):
+        self.append_stats(CompactPalindromeStats.from_text(text))
+
+    def append_stats(self, stats: CompactPalindromeStats):
+        self._lengths.append(stats.length)
+        self._flags.append(stats.flags)
+
+    def extend(self, texts):
+        for text in texts:
+            self.append(text)
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def __getitem__(self, index: int) -> CompactPalindromeStats:
+        return CompactPalindromeStats(self._lengths[index], self._flags[index])
+
+    def __iter__(self):
+        for length, flags in zip(self._lengths, self._flags):
+            yield CompactPalindromeStats(length, flags)
+
+    def count(self, flag: PalindromeFlag) -> int:
+        # 统计包含指定标志的记录数
+        return sum(1 for flags in self._flags if flags & flag)
+
+    def to_dicts(self):
+        # 逐条导出为 dict（生成器，避免一次性占用大量内存）
+        for stats in self:
+            yield stats.to_dict()
+
+    def as_numpy(self):
+        # 零拷贝地以 NumPy 数组形式返回 (lengths, flags) 两列
+        if np is None:
+            raise ImportError("as_numpy 需要安装 numpy")
+        return (np.frombuffer(self._lengths, dtype=np.uint64),
+                np.frombuffer(self._flags, dtype=np.uint8))
+
+
+def palindrome_stats(text: str) -> PalindromeStats:
+    # 获取字符串的回文统计信息（与 dict 兼容，字段按需计算）
+    view = _as_text(text)
+    if isinstance(view, str):
+        return PalindromeStats(view)
+    # 字节输入的 original 为 bytes（bytearray 等复制一份），结果不引用调用方的缓冲区，
+    # 可以 pickle，调用方也可以继续修改或调整 bytearray 的大小
+    original = text if type(text) is bytes else bytes(view)
+    return PalindromeStats(memoryview(original), original)
+
+
+# 每批打包进 NumPy 缓冲区的字符串数量
+_BATCH_CHUNK_SIZE = 65536
+
+# 清洗后长度不超过该值的字符串按长度分组、整组比较，更长的逐条比较
+_BATCH_MAX_WIDTH = 64
+
+
+def _normalize_for_mode(text: str, normalizer: Normalizer) -> str:
+    # 按模式清洗字符串，规则与对应的 is_palindrome_* 函数保持一致
+    cleaned = normalizer(_as_text(text))
+    # 字节按 latin-1 一一映射为码点，便于与字符串一起打包比较
+    return cleaned.decode('latin-1') if isinstance(cleaned, bytes) else cleaned
+
+
+def _normalize_chunk(chunk: list, normalizer: Normalizer):
+    """
+    整体清洗一批 str 输入，返回以 \x00 连接的清洗结果（simple / recursive 只连接不清洗）
+    含有字节类对象、非法输入或 \x00 字符时返回 None，由调用方逐条清洗
+    """
+    try:
+        joined = _BATCH_SEPARATOR.join(chunk)
+    except TypeError:
+        return None
+    if joined.count(_BATCH_SEPARATOR) != len(chunk) - 1:
+        return None
+    if normalizer.joined_fold is None:
+        return joined
+    return normalizer.joined_fold(joined)
+
+
+def _as_codes(text):
+    # 转为码点数组：bytes 与纯 ASCII 字符串每个码点一个字节，其余按 UTF-32
+    if isinstance(text, bytes):
+        return np.frombuffer(text, dtype=np.uint8)
+    if text.isascii():
+        return np.frombuffer(text.encode('ascii'), dtype=np.uint8)
+    return np.frombuffer(text.encode('utf-32-le', 'surrogatepass'), dtype=np.uint32)
+
+
+@lru_cache(maxsize=None)
+def _space_codes():
+    # str.strip 去掉的所有空白字符的码点
+    return np.array([code for code in range(0x110000) if chr(code).isspace()], dtype=np.uint32)
+
+
+def _strip_rows(codes, starts, ends):
+    # 逐段去掉首尾空白（每轮所有段各去掉一个字符，直到没有段以空白开头或结尾）
+    if codes.size == 0:
+        return starts, ends
+    spaces = _space_codes()
+    last = codes.size - 1
+    while True:
+        leading = (starts < ends) & np.isin(codes[np.minimum(starts, last)], spaces)
+        starts = starts + leading
+        trailing = (starts < ends) & np.isin(codes[ends - 1], spaces)
+        ends = ends - trailing
+        if not (leading.any() or trailing.any()):
+            return starts, ends
+
+
+def _mirror_check_rows(codes, starts, lengths):
+    """
+    向量化比较码点缓冲区中的多段（第 i 段为 codes[starts[i]:starts[i] + lengths[i]]）
+    按长度分组：同一组取出定长的前半行与逆序的后半行，整组一次比较
+    """
+    results = np.ones(lengths.size, dtype=bool)
+    order = np.argsort(lengths, kind='stable')
+    bounds = np.flatnonzero(np.diff(lengths[order])) + 1
+    for rows in np.split(order, bounds):
+        length = int(lengths[rows[0]])
+        half = length // 2
+        if half == 0:
+            continue
+        if length > _BATCH_MAX_WIDTH:
+            for row in rows.tolist():
+                segment = codes[starts[row]:starts[row] + length]
+                results[row] = np.array_equal(segment[:half], segment[:length - half - 1:-1])
+            continue
+        offsets = np.arange(half)
+        left = starts[rows, None] + offsets
+        right = starts[rows, None] + (length - 1 - offsets)
+        results[rows] = (codes[left] == codes[right]).all(axis=1)
+    return results
+
+
+def _mirror_check_joined(joined, strip: bool = False):
+    # 比较以 \x00 连接的一批清洗结果，strip 为 True 时先逐段去掉首尾空白
+    codes = _as_codes(joined)
+    separators = np.flatnonzero(codes == 0)
+    starts = np.concatenate(([0], separators + 1))
+    ends = np.append(separators, codes.size)
+    if strip:
+        starts, ends = _strip_rows(codes, starts, ends)
+    return _mirror_check_rows(codes, starts, ends - starts)
+
+
+def _mirror_check_chunk(cleaned: list):
+    # 比较逐条清洗得到的字符串列表（字符串中可能含有 \x00，按长度切分）
+    lengths = np.fromiter(map(len, cleaned), dtype=np.intp, count=len(cleaned))
+    codes = _as_codes(''.join(cleaned))
+    return _mirror_check_rows(codes, np.cumsum(lengths) - lengths, lengths)
+
+
+def is_palindrome_many(texts, mode: str = 'simple', chunk_size: int = _BATCH_CHUNK_SIZE,
+                       normalization: str = 'ascii'):
+    """
+    批量判断回文，结果与逐个调用对应模式的 is_palindrome_* 完全一致
+    安装了 NumPy 时返回布尔数组（向量化比较），否则返回布尔列表；元素也可以是字节类对象
+    Examples:
+        >>> [bool(flag) for flag in is_palindrome_many(["racecar", "Level", "hello"], mode='ignore_case')]
+        [True, True, False]
+    """
+    normalizer = get_normalizer(mode, normalization)
+    if chunk_size <= 0:
+        raise ValueError("chunk_size 必须为正整数")
+
+    iterator = iter(texts)
+    results = []
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            break
+        joined = _normalize_chunk(chunk, normalizer)
+        if joined is None:
+            cleaned = [_normalize_for_mode(text, normalizer) for text in chunk]
+        elif np is None:
+            separator = _BATCH_SEPARATOR if isinstance(joined, str) else _BATCH_SEPARATOR.encode()
+            cleaned = joined.split(separator)
+            if normalizer.strip:
+                cleaned = list(map(str.strip, cleaned))
+        if np is None:
+            results.extend(text == text[::-1] for text in cleaned)
+        elif joined is None:
+            results.append(_mirror_check_chunk(cleaned))
+        else:
+            results.append(_mirror_check_joined(joined, normalizer.strip))
+
+    if np is None:
+        return results
+    if not results:
+        return np.zeros(0, dtype=bool)
+    return np.concatenate(results)
+
+
+# 文件检查时每次从一端读取的字节数
+_FILE_BLOCK_SIZE = 1 << 20
+
+
+def _utf8_lead_length(byte: int) -> int:
+    # UTF-8 首字节对应的字符字节数，续字节和非法首字节返回 0
+    if byte < 0x80:
+        return 1
+    if 0xC2 <= byte < 0xE0:
+        return 2
+    if 0xE0 <= byte < 0xF0:
+        return 3
+    if 0xF0 <= byte < 0xF5:
+        return 4
+    return 0
+
+
+def _utf8_aligner(buffer, safe_cuts: bool = False):
+    # 将切分位置回退到 UTF-8 字符起始处（跳过 10xxxxxx 续字节）
+    # safe_cuts 时只在解码后满足 _is_safe_cut_char 的字符之前切分（Unicode 模式）
+    def is_safe(cut):
+        length = _utf8_lead_length(buffer[cut])
+        if length == 1:
             return True
+        try:
+            char = bytes(buffer[cut:cut + length]).decode('utf-8') if length else ''
+        except UnicodeDecodeError:
+            return False
+        return len(char) == 1 and _is_safe_cut_char(char)
+
+    def align(pos, lower, upper):
+        if safe_cuts:
+            return _find_safe_cut(is_safe, pos, lower, upper)
+        while lower < pos < len(buffer) and buffer[pos] & 0xC0 == 0x80:
+            pos -= 1
+        return pos
+    return align
+
+
+def is_palindrome_file(path, mode: str = 'simple', encoding_errors: str = 'strict',
+                       normalization: str = 'ascii') -> bool:
+    """
+    判断整个文件内容（UTF-8 / ASCII）是否为回文，模式与 is_palindrome_many 相同
+    文件通过 mmap 映射，从两端按块读取并解码，内存占用与文件大小无关
+    Examples:
+        >>> is_palindrome_file("genome.txt", mode='ignore_case')  # doctest: +SKIP
+        True
+    """
+    normalizer = get_normalizer(mode, normalization)
+
+    with open(path, 'rb') as file:
+        # 空文件无法 mmap，按空字符串处理
+        if os.fstat(file.fileno()).st_size == 0:
+            return True
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            def decode(chunk: bytes) -> str:
+                return chunk.decode('utf-8', encoding_errors)
+
+            def fold(chunk: bytes) -> str:
+                text = decode(chunk)
+                return text if normalizer.fold is None else normalizer.fold(text)
+
+            char_start = _utf8_aligner(buffer)
+
+            def fold_in_context(data, lo: int, hi: int) -> str:
+                # 两侧各预读 step 字节作为上下文，Σ 所需的上下文超出窗口时扩大窗口重试
+                step = _CASE_CONTEXT
+                while True:
+                    outer_lo = char_start(max(lo - step, 0), 0, lo)
+                    outer_hi = char_start(min(hi + step, len(data)), hi, len(data))
+                    window = decode(data[outer_lo:outer_hi])
+                    head = len(decode(data[outer_lo:lo]))
+                    stop = len(window) - len(decode(data[hi:outer_hi]))
+                    left, right = _case_context(window, head, stop)
+                    if ((left >= 0 or outer_lo == 0)
+                            and (right <= len(window) or outer_hi == len(data))):
+                        return _lower_window(window, head, stop, max(left, 0), min(right, len(window)))
+                    step *= 4
+
+            # 含 Σ 时带上下文逐块转小写
+            windowed = normalizer.context_fold is not None and buffer.find('Σ'.encode('utf-8')) >= 0
+            if windowed:
+                fold = fold_in_context
+
+            return _mirror_equal(buffer, fold, normalizer.strip, _FILE_BLOCK_SIZE,
+                                 _utf8_aligner(buffer, normalizer.safe_cuts), windowed)
+
+
+def _normalize_with_offsets(text, mode: str, normalization: str = 'ascii'):
+    """
+    按模式清洗输入，同时返回清洗结果中每个片段的位置
+    片段为单个原字符（NFKC 下为起始字符加后面会与之组合的字符），清洗结果为空的片段会被去掉
+    返回 (cleaned, bounds, starts, ends)：第 i 个片段清洗后为 cleaned[bounds[i]:bounds[i+1]]，
+    对应原输入 text[starts[i]:ends[i]]；bounds 为 None 表示每个片段都只清洗出一个字符，
+    starts / ends 为 None 表示片段与原输入一一对应
+    """
+    normalizer = get_normalizer(mode, normalization)
+    text = _as_text(text)
+    if isinstance(text, memoryview):
+        normalizer._check_bytes_supported()
+    if normalizer.fold is None:
+        return text, None, None, None
+
+    if isinstance(text, memoryview) or text.isascii():
+        # 字节与 ASCII 字符的清洗与上下文无关，每个字符只会原样保留、转小写或删除
+        cleaned = normalizer.byte_fold(text) if isinstance(text, memoryview) else normalizer.fold(text)
+        starts = ends = None
+        if len(cleaned) != len(text):
+            kept = [bytes((byte,)).isalnum() for byte in range(256)]
+            codes = text if isinstance(text, memoryview) else text.encode('ascii')
+            starts = [index for index, byte in enumerate(codes) if kept[byte]]
+            ends = [start + 1 for start in starts]
+        if normalizer.strip:
+            lo, hi = len(cleaned) - len(cleaned.lstrip()), len(cleaned.rstrip())
+            if (lo, hi) != (0, len(cleaned)):
+                cleaned = cleaned[lo:hi]
+                starts, ends = range(lo, hi), range(lo + 1, hi + 1)
+        return cleaned, None, starts, ends
+
+    # 在安全位置切分（NFKC 下在这些位置切分不影响清洗结果），逐段清洗
+    cuts = [index for index, char in enumerate(text)
+            if index == 0 or not normalizer.safe_cuts or _is_safe_cut_char(char)]
+    cuts.append(len(text))
+    memo = {}
+    pieces, starts, ends = [], [], []
+    for start, stop in zip(cuts, cuts[1:]):
+        segment = text[start:stop]
+        piece = memo.get(segment)
+        if piece is None:
+            piece = memo[segment] = normalizer.fold(segment)
+        if piece:
+            pieces.append(piece)
+            starts.append(start)
+            ends.append(stop)
+    if normalizer.strip:
+        # 去掉首尾清洗结果全为空白的片段
+        lo, hi = 0, len(pieces)
+        while lo < hi and not pieces[lo].strip():
+            lo += 1
+        while hi > lo and not pieces[hi - 1].strip():
+            hi -= 1
+        pieces, starts, ends = pieces[lo:hi], starts[lo:hi], ends[lo:hi]
+
+    cleaned = ''.join(pieces)
+    bounds = None
+    if len(cleaned) != len(pieces):
+        bounds = [0]
+        for piece in pieces:
+            bounds.append(bounds[-1] + len(piece))
+    elif len(pieces) == len(text):
+        starts = ends = None
+    return cleaned, bounds, starts, ends
+
+
+def _manacher(seq):
+    """
+    Manacher 算法，线性时间求每个中心的最长回文半径
+    odd[i]：以 seq[i] 为中心的最长奇数回文为 seq[i-odd[i]+1 : i+odd[i]]
+    even[i]：以 seq[i-1] 与 seq[i] 之间为中心的最长偶数回文为 seq[i-even[i] : i+even[i]]
+    """
+    n = len(seq)
+    odd = [0] * n
+    left, right = 0, -1
+    for i in range(n):
+        k = 1 if i > right else min(odd[left + right - i], right - i + 1)
+        while i - k >= 0 and i + k < n and seq[i - k] == seq[i + k]:
+            k += 1
+        odd[i] = k
+        if i + k - 1 > right:
+            left, right = i - k + 1, i + k - 1
+
+    even = [0] * n
+    left, right = 0, -1
+    for i in range(n):
+        k = 0 if i > right else min(even[left + right - i + 1], right - i + 1)
+        while i - k - 1 >= 0 and i + k < n and seq[i - k - 1] == seq[i + k]:
+            k += 1
+        even[i] = k
+        if i + k - 1 > right:
+            left, right = i - k, i + k - 1
+    return odd, even
+
+
+class _CenterSpans:
+    """
+    在清洗后的字符串上求各中心的极大回文，并收缩为由完整原字符组成的区间
+    一个原字符（或 NFKC 片段）清洗出多个字符时，回文两端可能落在片段中间，此时以同一中心对称收缩到片段边界；
+    ASCII 的 ignore_case 中 Σ 转小写依赖上下文（词尾为 ς），区间内含有 Σ 时按模式复核，
+    复核失败则收缩到不含 Σ 的部分，每个中心最多复核一次
+    """
+
+    def __init__(self, text, mode: str, normalization: str):
+        self.normalizer = get_normalizer(mode, normalization)
+        self.text = _as_text(text)
+        self.cleaned, self.bounds, self.starts, self.ends = _normalize_with_offsets(
+            self.text, mode, normalization)
+        self.odd, self.even = _manacher(self.cleaned)
+
+        size = len(self.cleaned)
+        self.token_at = self.next_bound = None
+        if self.bounds is not None:
+            # token_at[x]：在位置 x 开始的片段序号（x 为末尾时为片段数），不是片段边界时为 -1
+            self.token_at = [-1] * (size + 1)
+            for index, bound in enumerate(self.bounds):
+                self.token_at[bound] = index
+            # next_bound[x]：不小于 x 的第一个片段边界
+            self.next_bound = [size] * (size + 1)
+            for position in range(size - 1, -1, -1):
+                self.next_bound[position] = (position if self.token_at[position] >= 0
+                                             else self.next_bound[position + 1])
+
+        self.sigmas = None
+        if self.normalizer.context_fold is not None and isinstance(self.text, str) and 'Σ' in self.text:
+            # Σ 只清洗出一个字符，记录它们在清洗后字符串中的位置
+            tokens = range(len(self.text)) if self.starts is None else self.starts
+            self.sigmas = [index if self.bounds is None else self.bounds[index]
+                           for index, start in enumerate(tokens) if self.text[start] == 'Σ']
+
+    def candidates(self):
+        # 按中心顺序产出清洗后字符串上的极大回文区间，长度为 0 的偶数中心跳过
+        for i in range(len(self.cleaned)):
+            if self.even[i]:
+                yield i - self.even[i], i + self.even[i]
+            yield i - self.odd[i] + 1, i + self.odd[i]
+
+    def span(self, lo: int, hi: int):
+        # 把片段边界上的非空区间 [lo, hi) 映射回原输入区间
+        if self.bounds is not None:
+            lo, hi = self.token_at[lo], self.token_at[hi]
+        if self.starts is None:
+            return lo, hi
+        return self.starts[lo], self.ends[hi - 1]
+
+    def _align(self, lo: int, hi: int):
+        # 以同一中心对称收缩到两端都在片段边界上，收缩为空时返回 None
+        if self.bounds is None:
+            return (lo, hi) if lo < hi else None
+        while lo < hi:
+            shrink = self.next_bound[lo] - lo
+            lo, hi = lo + shrink, hi - shrink
+            if lo >= hi:
+                break
+            if self.token_at[hi] >= 0:
+                return lo, hi
+            lo, hi = lo + 1, hi - 1
+        return None
+
+    def settle(self, lo: int, hi: int):
+        """
+        把清洗后字符串上的回文区间收缩为按模式判断一定是回文、且由完整原字符组成的区间
+        收缩为空时返回 None
+        """
+        aligned = self._align(lo, hi)
+        if aligned is None or self.sigmas is None:
+            return aligned
+        lo, hi = aligned
+        position = bisect_left(self.sigmas, (lo + hi) / 2)
+        left = self.sigmas[position - 1] + 1 if position > 0 else lo
+        right = self.sigmas[position] if position < len(self.sigmas) else hi
+        if left <= lo and right >= hi:
+            return aligned
+        start, end = self.span(lo, hi)
+        if self.normalizer.is_palindrome(self.text[start:end]):
+            return aligned
+        shrink = max(left - lo, hi - right)
+        return self._align(lo + shrink, hi - shrink)
+
+
+def maximal_palindromes(text, mode: str = 'simple', normalization: str = 'ascii'):
+    """
+    按中心顺序产出每个中心处的极大回文 (start, end)，位置对应原输入 text[start:end]
+    依次为：第 0 个字符、第 0/1 个字符之间、第 1 个字符……，长度为 0 的中心会被跳过
+    区间由完整的原字符组成，按对应模式的 is_palindrome_* 判断一定是回文
+    Examples:
+        >>> list(maximal_palindromes("abba"))
+        [(0, 1), (1, 2), (0, 4), (2, 3), (3, 4)]
+    """
+    centers = _CenterSpans(text, mode, normalization)
+    for lo, hi in centers.candidates():
+        settled = centers.settle(lo, hi)
+        if settled is not None:
+            yield centers.span(*settled)
+
+
+def longest_palindrome_span(text, mode: str = 'simple', normalization: str = 'ascii') -> tuple:
+    """
+    线性时间求最长回文子串，返回原输入中的区间 (start, end)，长度相同时取最靠左的
+    mode / normalization 与 is_palindrome_many 相同，在对应模式清洗后的字符串上判断回文；
+    区间由完整的原字符组成，按对应模式的 is_palindrome_* 判断一定是回文
+    Examples:
+        >>> longest_palindrome_span("xyz Racecar!", mode='ignore_case')
+        (4, 11)
+    """
+    centers = _CenterSpans(text, mode, normalization)
+    if not centers.cleaned:
+        return 0, 0
+    if centers.bounds is None and centers.sigmas is None:
+        # 常见情况：区间无需收缩
+        best_start, best_stop = 0, 1
+        for lo, hi in centers.candidates():
+            if hi - lo > best_stop - best_start:
+                best_start, best_stop = lo, hi
+        return centers.span(best_start, best_stop)
+
+    # 按 (清洗后长度降序, 起点升序) 依次取出，需要收缩的收缩后放回，第一个无需收缩的即为答案
+    heap = [(lo - hi, lo, hi, False) for lo, hi in centers.candidates()]
+    heapq.heapify(heap)
+    while heap:
+        _, lo, hi, settled = heapq.heappop(heap)
+        if settled:
+            return centers.span(lo, hi)
+        shrunk = centers.settle(lo, hi)
+        if shrunk is not None:
+            heapq.heappush(heap, (shrunk[0] - shrunk[1], shrunk[0], shrunk[1], True))
+    return 0, 0
+
+
+def longest_palindromic_substring(text, mode: str = 'simple', normalization: str = 'ascii'):
+    """
+    返回最长回文子串（原输入中的片段，字节输入返回 bytes）
+    Examples:
+        >>> longest_palindromic_substring("Was it a car or a cat I saw?", mode='with_whitespace')
+        'Was it a car or a cat I saw'
+    """
+    text = _as_text(text)
+    start, end = longest_palindrome_span(text, mode, normalization)
+    piece = text[start:end]
+    return bytes(piece) if isinstance(piece, memoryview) else piece
+
+
+class PalindromicTree:
+    """
+    回文树（eertree）：在线维护字符串所有互不相同的回文子串
+    append 均摊 O(1)；节点信息按列保存在 array 中，转移边统一存放在一个 dict 里
+    Examples:
+        >>> tree = PalindromicTree.from_string("abba")
+        >>> tree.distinct_count
+        4
+        >>> sorted(tree.palindromes())
+        ['a', 'abba', 'b', 'bb']
+    """
+
+    # 两个根节点：0 为长度 -1 的虚根，1 为长度 0 的空串根
+    _IMAGINARY_ROOT = 0
+    _EMPTY_ROOT = 1
+
+    def __init__(self, text: str = ''):
+        self._chars = []
+        self._length = array('l', [-1, 0])
+        self._link = array('l', [self._IMAGINARY_ROOT, self._IMAGINARY_ROOT])
+        # 节点首次出现时在字符串中的结束位置
+        self._end = array('l', [-1, -1])
+        # 节点作为最长回文后缀出现的次数（未沿后缀链接累加）
+        self._count = array('l', [0, 0])
+        self._edges = {}
+        self._last = self._EMPTY_ROOT
+        self._suffix_lengths = array('l')
+        self.extend(text)
+
+    @classmethod
+    def from_string(cls, text: str) -> 'PalindromicTree':
+        # 由整个字符串批量构建
+        if not isinstance(text, str):
+            raise TypeError("输入必须是字符串")
+        return cls(text)
+
+    def _find(self, node: int, position: int) -> int:
+        # 沿后缀链接找到能在两侧扩展 chars[position] 的最长回文后缀
+        chars, length, link = self._chars, self._length, self._link
+        char = chars[position]
+        while True:
+            start = position - length[node] - 1
+            if start >= 0 and chars[start] == char:
+                return node
+            node = link[node]
+
+    def append(self, char: str) -> int:
+        # 追加一个字符，返回追加后最长回文后缀的长度
+        if not isinstance(char, str) or len(char) != 1:
+            raise TypeError("每次只能追加一个字符")
+        position = len(self._chars)
+        self._chars.append(char)
+
+        parent = self._find(self._last, position)
+        node = self._edges.get((parent, char))
+        if node is None:
+            node = len(self._length)
+            self._length.append(self._length[parent] + 2)
+            if self._length[node] == 1:
+                link = self._EMPTY_ROOT
+            else:
+                link = self._edges[(self._find(self._link[parent], position), char)]
+            self._link.append(link)
+            self._end.append(position)
+            self._count.append(0)
+            self._edges[(parent, char)] = node
 
-        # 如果首尾字符相同，递归检查子串
-        if s[start] == s[end]:
-            return _is_palindrome(s, start + 1, end - 1)
-        return False
-
-    return _is_palindrome(text, 0, len(text) - 1)
-
-
-def palindrome_stats(text: str) -> dict:
-    # 获取字符串的回文统计信息
-    if not isinstance(text, str):
-        raise TypeError("输入必须是字符串")
-
-    return {
-        'original': text,
-        'length': len(text),
-        'simple': is_palindrome_simple(text),
-        'ignore_case': is_palindrome_ignore_case(text),
-        'with_whitespace': is_palindrome_with_whitespace(text),
-        'recursive': is_palindrome_recursive(text),
-        'reversed': text[::-1],
-        'is_empty': len(text) == 0,
-        'is_single_char': len(text) == 1
-    }
\ No newline at end of file
+        self._count[node] += 1
+        self._last = node
+        self._suffix_lengths.append(self._length[node])
+        return self._length[node]
+
+    def extend(self, text: str):
+        for char in text:
+            self.append(char)
+
+    @property
+    def text(self) -> str:
+        return ''.join(self._chars)
+
+    @property
+    def distinct_count(self) -> int:
+        # 互不相同的非空回文子串个数
+        return len(self._length) - 2
+
+    @property
+    def suffix_lengths(self) -> array:
+        # 每次追加后最长回文后缀的长度
+        return self._suffix_lengths
+
+    def _palindrome(self, node: int) -> str:
+        end = self._end[node]
+        return ''.join(self._chars[end - self._length[node] + 1:end + 1])
+
+    def palindromes(self):
+        # 按首次出现的顺序产出所有互不相同的回文子串
+        for node in range(2, len(self._length)):
+            yield self._palindrome(node)
+
+    def occurrences(self) -> dict:
+        # 每个回文子串的出现次数：子节点的次数沿后缀链接累加到父节点
+        totals = array('l', self._count)
+        for node in range(len(totals) - 1, 1, -1):
+            totals[self._link[node]] += totals[node]
+        return {self._palindrome(node): totals[node] for node in range(2, len(totals))}
+
+
+class PalindromeIndex:
+    """
+    子串回文查询索引：预处理一次 Manacher 半径，之后 O(1) 回答 text[start:end] 是否为回文
+    查询结果与 is_palindrome_simple(text[start:end]) 一致，start/end 遵循切片语义（支持负数）
+    Examples:
+        >>> index = PalindromeIndex("xabbay")
+        >>> index.is_palindrome(1, 5), index.is_palindrome(0, 5)
+        (True, False)
+    """
+
+    def __init__(self, text: str):
+        odd, even = _manacher(_as_text(text))
+        typecode = 'I' if len(text) < 1 << 32 else 'Q'
+        self._odd = array(typecode, odd)
+        self._even = array(typecode, even)
+        self._size = len(text)
+
+    @classmethod
+    def from_radii(cls, odd, even) -> 'PalindromeIndex':
+        # 由已经算好的 Manacher 半径（array 或 memoryview）构建，不复制数据
+        index = cls.__new__(cls)
+        index._odd = odd
+        index._even = even
+        index._size = len(odd)
+        return index
+
+    def __len__(self) -> int:
+        return self._size
+
+    def is_palindrome(self, start: int = 0, end: int = None) -> bool:
+        start, end, _ = slice(start, end).indices(self._size)
+        length = end - start
+        if length <= 1:
+            return True
+        center = (start + end) // 2
+        if length % 2:
+            return 2 * self._odd[center] - 1 >= length
+        return 2 * self._even[center] >= length
+
+    def query_many(self, pairs):
+        """
+        批量查询，pairs 为 (start, end) 序列或形状为 (n, 2) 的数组
+        安装了 NumPy 时向量化计算并返回布尔数组，否则返回布尔列表
+        """
+        if np is None:
+            return [self.is_palindrome(start, end) for start, end in pairs]
+
+        pairs = np.asarray(pairs, dtype=np.int64).reshape(-1, 2)
+        if self._size == 0:
+            return np.ones(len(pairs), dtype=bool)
+        # 与切片相同的下标规范化：负数从末尾计算，再截断到 [0, size]
+        bounds = np.where(pairs < 0, pairs + self._size, pairs).clip(0, self._size)
+        starts, ends = bounds[:, 0], bounds[:, 1]
+        lengths = ends - starts
+        centers = np.minimum((starts + ends) // 2, self._size - 1)
+        dtype = f'u{self._odd.itemsize}'
+        odd = np.frombuffer(self._odd, dtype=dtype)[centers].astype(np.int64)
+        even = np.frombuffer(self._even, dtype=dtype)[centers].astype(np.int64)
+        covered = np.where(lengths % 2 == 1, 2 * odd - 1, 2 * even)
+        return (lengths <= 1) | (covered >= lengths)
+
+
+def palindrome_pairs(words, mode: str = 'simple', normalization: str = 'ascii'):
+    """
+    找出所有 words[i] + words[j] 为回文的有序下标对 (i, j)（i != j），以生成器逐个产出
+    每个单词先按 mode 单独清洗再拼接判断；simple / recursive 以及 ASCII 的 with_whitespace
+    与直接判断拼接结果完全一致，ignore_case 会分别去掉每个单词的首尾空白
+    用哈希表按清洗结果建立索引，枚举每个单词的切分位置，复杂度 O(n·L²)
+    Examples:
+        >>> sorted(palindrome_pairs(["abcd", "dcba", "lls", "s", "sssll"]))
+        [(0, 1), (1, 0), (2, 4), (3, 2)]
+    """
+    normalizer = get_normalizer(mode, normalization)
+    keys = [normalizer(_as_text(word)) for word in words]
+    positions = {}
+    for index, key in enumerate(keys):
+        positions.setdefault(key, []).append(index)
+
+    for index, key in enumerate(keys):
+        for cut in range(len(key) + 1):
+            prefix, suffix = key[:cut], key[cut:]
+            # key 的前缀是回文：与逆序等于剩余后缀的单词拼在 key 前面
+            if prefix == prefix[::-1]:
+                for other in positions.get(suffix[::-1], ()):
+                    if other != index:
+                        yield other, index
+            # key 的后缀是回文：与逆序等于前缀的单词拼在 key 后面（整词的情况已在 cut=0 时计入）
+            if cut != len(key) and suffix == suffix[::-1]:
+                for other in positions.get(prefix[::-1], ()):
+                    if other != index:
+                        yield index, other
+
+
+def _check_limit(limit):
+    if limit is not None and limit < 0:
+        raise ValueError("距离上限不能为负数")
+
+
+def palindrome_mismatch_distance(text, limit: int = None, mode: str = 'simple',
+                                 normalization: str = 'ascii') -> int:
+    """
+    按 mode 清洗后，镜像位置不相等的字符对数（即替换多少个字符可以变成回文）
+    指定 limit 时超过上限立即停止并返回 limit + 1；相等的块整体跳过，只在不相等的块内逐字符计数
+    Examples:
+        >>> palindrome_mismatch_distance("racecat")
+        1
+        >>> palindrome_mismatch_distance("abcdef", limit=1)
+        2
+    """
+    _check_limit(limit)
+    text = _as_text(text)
+    distance = 0
+    for left, right in get_normalizer(mode, normalization).blocks(text):
+        if left == right:
+            continue
+        distance += sum(1 for a, b in zip(left, right) if a != b)
+        if limit is not None and distance > limit:
+            return limit + 1
+    return distance
+
+
+def _common_prefix_length(a, i: int, b, j: int) -> int:
+    # a[i:] 与 b[j:] 的最长公共前缀长度：先倍增比较切片，再在不相等的切片内二分
+    total = min(len(a) - i, len(b) - j)
+    length, step = 0, 16
+    while length < total:
+        size = min(step, total - length)
+        if a[i + length:i + length + size] == b[j + length:j + length + size]:
+            length += size
+            step *= 2
+            continue
+        low, high = 0, size - 1
+        while low < high:
+            middle = (low + high + 1) // 2
+            if a[i + length:i + length + middle] == b[j + length:j + length + middle]:
+                low = middle
+            else:
+                high = middle - 1
+        return length + low
+    return length
+
+
+def palindrome_edit_distance(text, limit: int = None, mode: str = 'simple',
+                             normalization: str = 'ascii') -> int:
+    """
+    按 mode 清洗后，最少插入或删除多少个字符可以变成回文（等于长度减去最长回文子序列长度）
+    用 Myers O(ND) 算法求清洗结果与其逆序的插入删除距离（恰为该值的 2 倍），
+    公共部分按切片整体比较；指定 limit 时超过上限立即停止并返回 limit + 1，耗时 O(n·k)
+    Examples:
+        >>> palindrome_edit_distance("racecars")
+        1
+        >>> palindrome_edit_distance("abcdef", limit=2)
+        3
+    """
+    _check_limit(limit)
+    cleaned = get_normalizer(mode, normalization)(_as_text(text))
+    reverse = cleaned[::-1]
+    size = len(cleaned)
+    max_steps = 2 * size if limit is None else min(2 * size, 2 * limit)
+
+    # furthest[diagonal] 为该对角线（x - y）上已到达的最远 x
+    furthest = {1: 0}
+    for steps in range(max_steps + 1):
+        for diagonal in range(-steps, steps + 1, 2):
+            if diagonal == -steps or (diagonal != steps and furthest[diagonal - 1] < furthest[diagonal + 1]):
+                x = furthest[diagonal + 1]
+            else:
+                x = furthest[diagonal - 1] + 1
+            y = x - diagonal
+            x += _common_prefix_length(cleaned, x, reverse, y)
+            furthest[diagonal] = x
+            if x >= size and x - diagonal >= size:
+                return steps // 2
+    return limit + 1
+
+
+def is_palindrome_k_mismatch(text, k: int, mode: str = 'simple', normalization: str = 'ascii') -> bool:
+    # 最多替换 k 个字符即可成为回文
+    return palindrome_mismatch_distance(text, k, mode, normalization) <= k
+
+
+def is_palindrome_k_edit(text, k: int, mode: str = 'simple', normalization: str = 'ascii') -> bool:
+    # 最多插入或删除 k 个字符即可成为回文
+    return palindrome_edit_distance(text, k, mode, normalization) <= k
+
+
+# 近似回文的距离度量
+DISTANCE_METRICS = {
+    'mismatch': palindrome_mismatch_distance,
+    'edit': palindrome_edit_distance,
+}
+
+
+def palindrome_distance_many(texts, limit: int, metric: str = 'mismatch', mode: str = 'simple',
+                             normalization: str = 'ascii'):
+    """
+    批量计算近似回文距离，超过 limit 的记为 limit + 1
+    安装了 NumPy 时返回整数数组，否则返回整数列表
+    Examples:
+        >>> [int(d) for d in palindrome_distance_many(["abba", "abca", "abcd"], 1)]
+        [0, 1, 2]
+    """
+    if metric not in DISTANCE_METRICS:
+        raise ValueError(f"不支持的距离度量: {metric}")
+    _check_limit(limit)
+    get_normalizer(mode, normalization)
+    distance = DISTANCE_METRICS[metric]
+    scores = (distance(text, limit, mode, normalization) for text in texts)
+    if np is None:
+        return list(scores)
+    return np.fromiter(scores, dtype=np.int64)
+
+
+def stream_palindromes(chunks, min_length: int, max_length: int):
+    """
+    在分块到达的无界输入（str 或字节块）中查找长度不小于 min_length 的极大回文，逐个产出 (offset, length)
+    offset 为在整个流中的起始位置，按中心顺序产出（与 maximal_palindromes 相同）
+    只保留约 max_length 个字符的重叠窗口，因此长度上限为 max_length：更长的回文会被截为同一中心、
+    同奇偶且不超过 max_length 的最长回文，跨越块边界的回文可以正确识别
+    Examples:
+        >>> list(stream_palindromes(["xxab", "cbayy"], 5, 10))
+        [(2, 5)]
+    """
+    if min_length < 1:
+        raise ValueError("min_length 必须为正整数")
+    if max_length < min_length:
+        raise ValueError("max_length 不能小于 min_length")
+    odd_cap = (max_length + 1) // 2
+    even_cap = max_length // 2
+    # 中心两侧需要保留的字符数
+    margin = max_length // 2 + 1
+
+    buffer = None
+    # buffer[0] 在流中的位置，以及下一个待处理的中心位置
+    base = next_center = 0
+    iterator = iter(chunks)
+    finished = False
+    while not finished:
+        chunk = next(iterator, None)
+        if chunk is None:
+            finished = True
+        else:
+            if not isinstance(chunk, (str, bytes)):
+                chunk = bytes(_as_text(chunk))
+            buffer = chunk if buffer is None else buffer + chunk
+        if buffer is None:
+            continue
+
+        # 右侧已有足够字符（或流已结束）的中心才能确定
+        stop = len(buffer) if finished else len(buffer) - margin
+        if next_center - base < stop:
+            odd, even = _manacher(buffer)
+            for i in range(next_center - base, stop):
+                radius = min(even[i], even_cap)
+                if 2 * radius >= min_length:
+                    yield base + i - radius, 2 * radius
+                radius = min(odd[i], odd_cap)
+                if 2 * radius - 1 >= min_length:
+                    yield base + i - radius + 1, 2 * radius - 1
+            next_center = base + stop
+
+        # 丢弃下一个中心左侧 margin 之外的字符
+        drop = next_center - base - margin
+        if drop > 0:
+            buffer = buffer[drop:]
+            base += drop
+
+
+# 多项式哈希的模数（梅森素数 2^61 - 1）
+_HASH_MOD = (1 << 61) - 1
+
+
+class PalindromeBuffer:
+    """
+    可编辑的字符串缓冲区，编辑后可以快速判断整体或任意区间是否为回文
+    用隐式 treap 按位置组织字符，每个节点维护子树的正向和逆向多项式哈希（模 2^61 - 1），
+    插入、删除、替换和区间查询的期望复杂度均为 O(log n)，整体查询为 O(1)
+    哈希相等即判定为回文，误判概率约为 n / 2^61
+    Examples:
+        >>> buffer = PalindromeBuffer("racecar")
+        >>> buffer.replace(0, "x"); buffer.is_palindrome()
+        False
+        >>> buffer.is_palindrome(1, 6)
+        True
+    """
+
+    # 节点 0 为空节点，各字段按列保存在列表中
+    def __init__(self, text: str = '', seed=None):
+        if not isinstance(text, str):
+            raise TypeError("输入必须是字符串")
+        self._random = random.Random(seed)
+        self._base = self._random.randrange(1 << 20, _HASH_MOD - 1)
+        self._powers = [1]
+        self._left = [0]
+        self._right = [0]
+        self._priority = [0.0]
+        self._size = [0]
+        self._code = [0]
+        self._forward = [0]
+        self._backward = [0]
+        self._free = []
+        self._root = self._build(text)
+
+    def _power(self, exponent: int) -> int:
+        powers = self._powers
+        while len(powers) <= exponent:
+            powers.append(powers[-1] * self._base % _HASH_MOD)
+        return powers[exponent]
+
+    def _new_node(self, char: str) -> int:
+        code = ord(char) + 1
+        priority = self._random.random()
+        if self._free:
+            node = self._free.pop()
+            self._left[node] = self._right[node] = 0
+            self._priority[node] = priority
+            self._size[node] = 1
+            self._code[node] = self._forward[node] = self._backward[node] = code
+            return node
+        self._left.append(0)
+        self._right.append(0)
+        self._priority.append(priority)
+        self._size.append(1)
+        self._code.append(code)
+        self._forward.append(code)
+        self._backward.append(code)
+        return len(self._code) - 1
+
+    def _update(self, node: int):
+        # 由左右子树重新计算 node 的大小和哈希
+        left, right = self._left[node], self._right[node]
+        left_size, right_size = self._size[left], self._size[right]
+        code = self._code[node]
+        self._size[node] = left_size + right_size + 1
+        self._forward[node] = ((self._forward[left] * self._base + code) * self._power(right_size)
+                               + self._forward[right]) % _HASH_MOD
+        self._backward[node] = ((self._backward[right] * self._base + code) * self._power(left_size)
+                                + self._backward[left]) % _HASH_MOD
+
+    def _build(self, text: str) -> int:
+        # 按随机优先级线性构建笛卡尔树，返回根节点
+        stack = []
+        for char in text:
+            node = self._new_node(char)
+            last = 0
+            while stack and self._priority[stack[-1]] < self._priority[node]:
+                last = stack.pop()
+                self._update(last)
+            self._left[node] = last
+            if stack:
+                self._right[stack[-1]] = node
+            stack.append(node)
+        while stack:
+            last = stack.pop()
+            self._update(last)
+            if not stack:
+                return last
+        return 0
+
+    def _split(self, node: int, count: int):
+        # 拆分为前 count 个字符和其余部分
+        if not node:
+            return 0, 0
+        left = self._left[node]
+        if self._size[left] >= count:
+            first, second = self._split(left, count)
+            self._left[node] = second
+            self._update(node)
+            return first, node
+        first, second = self._split(self._right[node], count - self._size[left] - 1)
+        self._right[node] = first
+        self._update(node)
+        return node, second
+
+    def _merge(self, first: int, second: int) -> int:
+        if not first or not second:
+            return first or second
+        if self._priority[first] > self._priority[second]:
+            self._right[first] = self._merge(self._right[first], second)
+            self._update(first)
+            return first
+        self._left[second] = self._merge(first, self._left[second])
+        self._update(second)
+        return second
+
+    def _release(self, node: int):
+        # 回收被删除子树的所有节点
+        stack = [node] if node else []
+        while stack:
+            node = stack.pop()
+            self._free.append(node)
+            stack.extend(child for child in (self._left[node], self._right[node]) if child)
+
+    def __len__(self) -> int:
+        return self._size[self._root]
+
+    def __str__(self) -> str:
+        chars, stack, node = [], [], self._root
+        while stack or node:
+            while node:
+                stack.append(node)
+                node = self._left[node]
+            node = stack.pop()
+            chars.append(chr(self._code[node] - 1))
+            node = self._right[node]
+        return ''.join(chars)
+
+    def __repr__(self) -> str:
+        return f"PalindromeBuffer({str(self)!r})"
+
+    def __getitem__(self, index: int) -> str:
+        size = len(self)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("下标越界")
+        node = self._root
+        while True:
+            left_size = self._size[self._left[node]]
+            if index < left_size:
+                node = self._left[node]
+            elif index == left_size:
+                return chr(self._code[node] - 1)
+            else:
+                index -= left_size + 1
+                node = self._right[node]
+
+    def insert(self, index: int, text: str):
+        # 在 index 处插入字符串（与 list.insert 相同，越界时插入到两端）
+        if not isinstance(text, str):
+            raise TypeError("输入必须是字符串")
+        index, _, _ = slice(index, None).indices(len(self))
+        first, second = self._split(self._root, index)
+        self._root = self._merge(self._merge(first, self._build(text)), second)
+
+    def delete(self, start: int, end: int = None):
+        # 删除 [start:end) 区间（切片语义），end 省略时只删除 start 处的一个字符
+        if end is None:
+            if not -len(self) <= start < len(self):
+                raise IndexError("下标越界")
+            start %= len(self)
+            end = start + 1
+        start, end, _ = slice(start, end).indices(len(self))
+        if start >= end:
+            return
+        first, rest = self._split(self._root, start)
+        removed, second = self._split(rest, end - start)
+        self._release(removed)
+        self._root = self._merge(first, second)
+
+    def replace(self, index: int, text: str):
+        # 从 index 开始用 text 覆盖等长的字符
+        if not isinstance(text, str):
+            raise TypeError("输入必须是字符串")
+        if index < 0:
+            index += len(self)
+        if not 0 <= index <= len(self) - len(text):
+            raise IndexError("下标越界")
+        first, rest = self._split(self._root, index)
+        removed, second = self._split(rest, len(text))
+        self._release(removed)
+        self._root = self._merge(self._merge(first, self._build(text)), second)
+
+    def is_palindrome(self, start: int = 0, end: int = None) -> bool:
+        # 整体或 [start:end) 区间是否为回文，start/end 遵循切片语义
+        start, end, _ = slice(start, end).indices(len(self))
+        if end - start <= 1:
+            return True
+        if start == 0 and end == len(self):
+            return self._forward[self._root] == self._backward[self._root]
+        first, rest = self._split(self._root, start)
+        middle, second = self._split(rest, end - start)
+        result = self._forward[middle] == self._backward[middle]
+        self._root = self._merge(self._merge(first, middle), second)
+        return result
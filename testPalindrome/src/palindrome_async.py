@@ -0,0 +1,106 @@
+"""
+asyncio 流式回文判断：逐条消费异步（或普通）可迭代对象，按输入顺序产出结果
+
+短输入直接在事件循环中判断；长度达到 offload_threshold 的输入交给线程池或进程池，
+避免阻塞事件循环。同时在途的输入不超过 concurrency 条，消费者处理不过来时不再读取上游。
+
+用法：
+    from src.palindrome_async import check_stream
+    async for text, result in check_stream(reader, mode='with_whitespace', concurrency=16):
+        ...
+"""
+import asyncio
+from collections import deque
+
+from .palindrome import (
+    is_palindrome_simple,
+    is_palindrome_ignore_case,
+    is_palindrome_with_whitespace,
+    is_palindrome_recursive,
+    get_normalizer,
+)
+
+# 各模式对应的判断函数
+CHECKERS = {
+    'simple': is_palindrome_simple,
+    'ignore_case': is_palindrome_ignore_case,
+    'with_whitespace': is_palindrome_with_whitespace,
+    'recursive': is_palindrome_recursive,
+}
+
+# 默认同时在途的输入条数
+DEFAULT_CONCURRENCY = 8
+
+# 长度达到该值（字符数或字节数）的输入交给执行器处理
+DEFAULT_OFFLOAD_THRESHOLD = 1 << 16
+
+
+def check_one(text, mode: str = 'simple', normalization: str = 'ascii') -> bool:
+    # 在执行器中运行的单条判断（模块级函数，可以被进程池序列化）
+    if mode in ('ignore_case', 'with_whitespace'):
+        return CHECKERS[mode](text, normalization)
+    return CHECKERS[mode](text)
+
+
+async def _iterate(source):
+    # 同时支持异步可迭代对象和普通可迭代对象
+    if hasattr(source, '__aiter__'):
+        async for item in source:
+            yield item
+    else:
+        for item in source:
+            yield item
+
+
+async def check_stream(source, mode: str = 'simple', *, concurrency: int = DEFAULT_CONCURRENCY,
+                       offload_threshold: int = DEFAULT_OFFLOAD_THRESHOLD, executor=None,
+                       normalization: str = 'ascii'):
+    """
+    异步生成器，按输入顺序产出 (输入, 是否为回文)
+    executor 为 None 时使用事件循环默认的线程池；传入 ProcessPoolExecutor 可以绕开 GIL
+    某条输入判断出错时，异常在轮到该条输入时抛出；提前退出迭代会取消尚未完成的任务
+    Examples:
+        >>> async def demo():
+        ...     return [result async for _, result in check_stream(["racecar", "hello"])]
+        >>> asyncio.run(demo())
+        [True, False]
+    """
+    # 提前校验模式和清洗方式
+    get_normalizer(mode, normalization)
+    if concurrency <= 0:
+        raise ValueError("concurrency 必须为正整数")
+    if offload_threshold < 0:
+        raise ValueError("offload_threshold 不能为负数")
+
+    loop = asyncio.get_running_loop()
+    pending = deque()
+    # 自上次让出事件循环以来在循环内完成的判断量
+    inline_work = 0
+    try:
+        async for text in _iterate(source):
+            if len(text) >= offload_threshold:
+                future = loop.run_in_executor(executor, check_one, text, mode, normalization)
+            else:
+                future = loop.create_future()
+                try:
+                    future.set_result(check_one(text, mode, normalization))
+                except Exception as error:
+                    future.set_exception(error)
+                inline_work += len(text) + 1
+                # 连续的短输入累计到阈值后让出一次事件循环
+                if inline_work >= offload_threshold:
+                    inline_work = 0
+                    await asyncio.sleep(0)
+            pending.append((text, future))
+
+            # 队首已完成的结果立即产出；在途数量达到上限时等待队首完成（背压）
+            while pending and (pending[0][1].done() or len(pending) >= concurrency):
+                head, future = pending.popleft()
+                yield head, await future
+
+        while pending:
+            head, future = pending.popleft()
+            yield head, await future
+    finally:
+        for _, future in pending:
+            future.cancel()
@@ -0,0 +1,205 @@
+"""
+可选的回文判断缓存层：按输入记忆结果，支持条目数 / 内存上限的 LRU 淘汰和 TTL 过期
+
+默认不启用，需要时显式包装：
+    from src.palindrome_cache import memoize, cached_functions
+    stats = memoize(palindrome_stats, maxsize=10000, ttl=60)
+    api = cached_functions({'palindrome_stats': {'max_bytes': 64 << 20}}, maxsize=4096)
+"""
+import functools
+import hashlib
+import sys
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from types import MappingProxyType
+
+from .palindrome import (
+    is_palindrome_simple,
+    is_palindrome_ignore_case,
+    is_palindrome_with_whitespace,
+    is_palindrome_recursive,
+    palindrome_stats,
+    PalindromeStats,
+    _restore_stats,
+)
+
+# 可以包装缓存的函数
+CACHEABLE_FUNCTIONS = {
+    'is_palindrome_simple': is_palindrome_simple,
+    'is_palindrome_ignore_case': is_palindrome_ignore_case,
+    'is_palindrome_with_whitespace': is_palindrome_with_whitespace,
+    'is_palindrome_recursive': is_palindrome_recursive,
+    'palindrome_stats': palindrome_stats,
+}
+
+# 超过该长度的输入用摘要作为键，避免缓存键本身占用大量内存
+DEFAULT_HASH_THRESHOLD = 4096
+
+CacheInfo = namedtuple('CacheInfo', [
+    'hits', 'misses', 'evictions', 'expirations',
+    'currsize', 'current_bytes', 'maxsize', 'max_bytes',
+])
+
+
+def estimate_size(key, value) -> int:
+    # 估算一个缓存条目占用的内存；回文统计结果会引用原输入和反转后的副本，一并计入
+    size = sys.getsizeof(key) + sys.getsizeof(value)
+    if isinstance(value, MappingProxyType):
+        # 只读快照本身不计入底层 dict
+        size += sys.getsizeof(value.copy())
+    if isinstance(value, (PalindromeStats, MappingProxyType)):
+        for field in ('original', 'reversed'):
+            data = value.get(field)
+            # memoryview 只计视图对象本身，按缓冲区长度计入
+            size += data.nbytes if isinstance(data, memoryview) else sys.getsizeof(data)
+    return size
+
+
+def _freeze(value):
+    # PalindromeStats 可以被调用方修改，缓存中保存补齐全部字段后的只读快照
+    if isinstance(value, PalindromeStats):
+        return MappingProxyType(value.to_dict())
+    return value
+
+
+def _thaw(value):
+    # 每次命中都从快照构建新的 PalindromeStats，调用方之间互不影响
+    if isinstance(value, MappingProxyType):
+        return _restore_stats(value)
+    return value
+
+
+class PalindromeCache:
+    """
+    线程安全的 LRU + TTL 缓存
+    maxsize 限制条目数，max_bytes 限制估算内存，ttl 为条目存活秒数（None 表示不过期）
+    """
+
+    def __init__(self, maxsize: int = 1024, max_bytes: int = None, ttl: float = None,
+                 hash_threshold: int = DEFAULT_HASH_THRESHOLD, size_of=estimate_size,
+                 clock=time.monotonic):
+        if maxsize is not None and maxsize <= 0:
+            raise ValueError("maxsize 必须为正整数")
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hash_threshold = hash_threshold
+        self._size_of = size_of
+        self._clock = clock
+        # key -> (value, size, expires_at)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def make_key(self, text, args=(), kwargs=None):
+        # 短输入直接作为键，长输入使用 (类型, 长度, 摘要)
+        if len(text) > self.hash_threshold:
+            data = text.encode('utf-8', 'surrogatepass') if isinstance(text, str) else bytes(text)
+            text = (type(text).__name__, len(text), hashlib.blake2b(data, digest_size=16).digest())
+        if not args and not kwargs:
+            return text
+        return (text, args, tuple(sorted(kwargs.items())) if kwargs else ())
+
+    def get(self, key):
+        # 返回 (是否命中, 值)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return False, None
+            value, size, expires_at = entry
+            if expires_at is not None and self._clock() >= expires_at:
+                del self._entries[key]
+                self._bytes -= size
+                self.expirations += 1
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, value
+
+    def put(self, key, value):
+        size = self._size_of(key, value)
+        # 单个条目超过内存上限时不缓存
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        expires_at = None if self.ttl is None else self._clock() + self.ttl
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (value, size, expires_at)
+            self._bytes += size
+            while self._entries and (
+                    (self.maxsize is not None and len(self._entries) > self.maxsize)
+                    or (self.max_bytes is not None and self._bytes > self.max_bytes)):
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def info(self) -> CacheInfo:
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.evictions, self.expirations,
+                             len(self._entries), self._bytes, self.maxsize, self.max_bytes)
+
+
+def memoize(func=None, *, maxsize: int = 1024, max_bytes: int = None, ttl: float = None,
+            hash_threshold: int = DEFAULT_HASH_THRESHOLD, size_of=estimate_size):
+    """
+    为以字符串为第一个参数的函数加上缓存，可直接调用或作为装饰器使用
+    包装后的函数提供 cache、cache_info() 和 cache_clear()
+    非字符串/字节输入不经过缓存，直接交给原函数（由原函数抛出 TypeError）
+    """
+    if func is None:
+        return functools.partial(memoize, maxsize=maxsize, max_bytes=max_bytes, ttl=ttl,
+                                 hash_threshold=hash_threshold, size_of=size_of)
+
+    cache = PalindromeCache(maxsize=maxsize, max_bytes=max_bytes, ttl=ttl,
+                            hash_threshold=hash_threshold, size_of=size_of)
+
+    @functools.wraps(func)
+    def wrapper(text, *args, **kwargs):
+        if not isinstance(text, (str, bytes)):
+            return func(text, *args, **kwargs)
+        key = cache.make_key(text, args, kwargs)
+        found, value = cache.get(key)
+        if found:
+            return _thaw(value)
+        value = func(text, *args, **kwargs)
+        cache.put(key, _freeze(value))
+        return value
+
+    wrapper.cache = cache
+    wrapper.cache_info = cache.info
+    wrapper.cache_clear = cache.clear
+    return wrapper
+
+
+def cached_functions(config: dict = None, **defaults) -> dict:
+    """
+    按函数名返回带缓存的版本，config 形如 {函数名: memoize 参数}
+    config 中未列出的函数使用 defaults；参数值为 None 的函数不加缓存
+    """
+    config = config or {}
+    unknown = set(config) - set(CACHEABLE_FUNCTIONS)
+    if unknown:
+        raise ValueError(f"不支持缓存的函数: {', '.join(sorted(unknown))}")
+
+    wrapped = {}
+    for name, func in CACHEABLE_FUNCTIONS.items():
+        options = config.get(name, defaults)
+        wrapped[name] = func if options is None else memoize(func, **options)
+    return wrapped
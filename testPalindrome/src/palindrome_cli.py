@@ -0,0 +1,207 @@
+"""
+回文语料扫描命令行工具：逐行判断大文件中的每一行是否为回文
+
+按字节偏移把文件切成若干对齐到行首的分片，分发到多个进程并行处理，
+结果按输入顺序以 JSONL 或 CSV 格式输出，并在标准错误输出上报告吞吐量。
+
+用法（在 testPalindrome 目录下）：
+    python -m src.palindrome_cli corpus.txt --mode with_whitespace --workers 16 -o result.jsonl
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from .palindrome import (
+    is_palindrome_simple,
+    is_palindrome_ignore_case,
+    is_palindrome_with_whitespace,
+)
+
+# 命令行支持的模式
+CHECKERS = {
+    'simple': is_palindrome_simple,
+    'ignore_case': is_palindrome_ignore_case,
+    'with_whitespace': is_palindrome_with_whitespace,
+}
+
+# 默认分片大小（字节）
+DEFAULT_SHARD_SIZE = 64 << 20
+
+# 吞吐量报告的最小间隔（秒）
+PROGRESS_INTERVAL = 5.0
+
+
+def split_shards(path, shard_size: int = DEFAULT_SHARD_SIZE):
+    # 按字节偏移切分文件，每个分片的边界都对齐到行首，返回 [(start, end), ...]
+    if shard_size <= 0:
+        raise ValueError("shard_size 必须为正整数")
+    size = os.path.getsize(path)
+    shards = []
+    with open(path, 'rb') as file:
+        start = 0
+        while start < size:
+            end = start + shard_size
+            if end < size:
+                # 把分片延伸到所在行的末尾
+                file.seek(end)
+                file.readline()
+                end = file.tell()
+            end = min(end, size)
+            shards.append((start, end))
+            start = end
+    return shards
+
+
+def scan_shard(path, start: int, end: int, mode: str, encoding_errors: str = 'replace'):
+    # 在子进程中扫描一个分片，返回每行的起始偏移和结果（用紧凑数组减少进程间传输量）
+    checker = CHECKERS[mode]
+    offsets = array('Q')
+    results = bytearray()
+    with open(path, 'rb') as file:
+        file.seek(start)
+        offset = start
+        while offset < end:
+            line = file.readline()
+            if not line:
+                break
+            text = line[:-1] if line.endswith(b'\n') else line
+            if text.endswith(b'\r'):
+                text = text[:-1]
+            offsets.append(offset)
+            results.append(checker(text.decode('utf-8', encoding_errors)))
+            offset += len(line)
+    return offsets, bytes(results)
+
+
+class CorpusScanner:
+    """
+    多进程语料扫描器，scan() 按输入顺序逐行产出 (文件, 行号, 字节偏移, 结果)
+    同时在途的分片数量有上限，内存占用与语料大小无关
+    """
+
+    def __init__(self, mode: str = 'simple', workers: int = None,
+                 shard_size: int = DEFAULT_SHARD_SIZE, encoding_errors: str = 'replace',
+                 progress=None):
+        if mode not in CHECKERS:
+            raise ValueError(f"不支持的模式: {mode}")
+        self.mode = mode
+        self.workers = workers or os.cpu_count() or 1
+        self.shard_size = shard_size
+        self.encoding_errors = encoding_errors
+        # progress 为可写的文本流（如 sys.stderr），为 None 时不输出进度
+        self.progress = progress
+        self.lines = 0
+        self.bytes = 0
+        self.started = None
+        self._last_report = 0.0
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started if self.started else 0.0
+
+    def throughput(self) -> str:
+        elapsed = max(self.elapsed, 1e-9)
+        return (f"{self.lines} 行, {self.bytes / 1e6:.1f} MB, {elapsed:.2f} 秒, "
+                f"{self.lines / elapsed:.0f} 行/秒, {self.bytes / 1e6 / elapsed:.1f} MB/秒")
+
+    def _tasks(self, paths):
+        # 同一文件可能出现多次，按输入中的位置区分
+        for file_index, path in enumerate(paths):
+            for start, end in split_shards(path, self.shard_size):
+                yield file_index, path, start, end
+
+    def _report(self, force: bool = False):
+        if self.progress is None:
+            return
+        now = time.perf_counter()
+        if force or now - self._last_report >= PROGRESS_INTERVAL:
+            self._last_report = now
+            print(f"[palindrome] {self.throughput()}", file=self.progress)
+
+    def _collect(self, task, shard_result, line_numbers):
+        file_index, path, start, end = task
+        offsets, results = shard_result
+        self.bytes += end - start
+        line_number = line_numbers.get(file_index, 0)
+        for offset, result in zip(offsets, results):
+            line_number += 1
+            yield path, line_number, offset, bool(result)
+        line_numbers[file_index] = line_number
+        self.lines += len(offsets)
+        self._report()
+
+    def scan(self, paths):
+        self.started = self._last_report = time.perf_counter()
+        line_numbers = {}
+        if self.workers == 1:
+            for task in self._tasks(paths):
+                _, path, start, end = task
+                shard = scan_shard(path, start, end, self.mode, self.encoding_errors)
+                yield from self._collect(task, shard, line_numbers)
+        else:
+            # 在途分片数量上限，保证按顺序输出时缓冲的结果有界
+            max_pending = 2 * self.workers
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                pending = deque()
+                for task in self._tasks(paths):
+                    _, path, start, end = task
+                    future = executor.submit(scan_shard, path, start, end, self.mode,
+                                             self.encoding_errors)
+                    pending.append((task, future))
+                    if len(pending) >= max_pending:
+                        task, future = pending.popleft()
+                        yield from self._collect(task, future.result(), line_numbers)
+                while pending:
+                    task, future = pending.popleft()
+                    yield from self._collect(task, future.result(), line_numbers)
+        self._report(force=True)
+
+
+def write_results(records, output, output_format: str = 'jsonl'):
+    # 把 (文件, 行号, 字节偏移, 结果) 写为 JSONL 或 CSV
+    if output_format == 'csv':
+        writer = csv.writer(output)
+        writer.writerow(['file', 'line', 'offset', 'result'])
+        for path, line_number, offset, result in records:
+            writer.writerow([path, line_number, offset, int(result)])
+    else:
+        for path, line_number, offset, result in records:
+            output.write(json.dumps({'file': path, 'line': line_number,
+                                     'offset': offset, 'result': result},
+                                    ensure_ascii=False) + '\n')
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="并行扫描按行组织的语料，判断每一行是否为回文")
+    parser.add_argument('paths', nargs='+', help="输入文件（UTF-8，每行一条记录）")
+    parser.add_argument('--mode', choices=sorted(CHECKERS), default='simple', help="判断模式")
+    parser.add_argument('--workers', type=int, default=None, help="进程数，默认为 CPU 核数")
+    parser.add_argument('--shard-size', type=int, default=DEFAULT_SHARD_SIZE,
+                        help="每个分片的字节数")
+    parser.add_argument('--format', dest='output_format', choices=['jsonl', 'csv'],
+                        default='jsonl', help="输出格式")
+    parser.add_argument('-o', '--output', default='-', help="输出文件，默认为标准输出")
+    parser.add_argument('--quiet', action='store_true', help="不输出吞吐量报告")
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    scanner = CorpusScanner(mode=args.mode, workers=args.workers, shard_size=args.shard_size,
+                            progress=None if args.quiet else sys.stderr)
+    if args.output == '-':
+        write_results(scanner.scan(args.paths), sys.stdout, args.output_format)
+    else:
+        with open(args.output, 'w', encoding='utf-8', newline='') as output:
+            write_results(scanner.scan(args.paths), output, args.output_format)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
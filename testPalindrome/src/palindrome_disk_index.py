@@ -0,0 +1,235 @@
+"""
+持久化的回文索引文件：对静态语料预先计算每条记录的回文标志和 Manacher 半径，
+写入二进制索引文件，之后通过 mmap 按需读取，重复查询无需重新计算
+
+文件布局（小端序）：
+    文件头（64 字节）  magic、版本号、记录数、各个表的偏移、源文件大小和修改时间
+    半径区            每条记录依次存放 odd 半径和 even 半径（各 length 个 uint32）
+    长度表            每条记录的长度（uint64）
+    标志表            每条记录的 PalindromeFlag（uint8）
+    起始表            每条记录半径在半径区中的起始下标（uint64，共 n + 1 项）
+
+用法：
+    from src.palindrome_disk_index import load_or_build
+    with load_or_build("corpus.txt", "corpus.palidx") as index:
+        index[42]['with_whitespace'], index.is_palindrome(42, 3, 10)
+"""
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from .palindrome import (
+    CompactPalindromeStats,
+    PalindromeIndex,
+    _manacher,
+)
+
+try:
+    import numpy as np
+except ImportError:  # numpy 为可选依赖，缺失时 count 退化为逐条统计
+    np = None
+
+MAGIC = b'PALIDX\x00\x00'
+VERSION = 1
+
+# magic, version, reserved, record_count, lengths_offset, flags_offset, starts_offset,
+# source_size, source_mtime_ns
+_HEADER = struct.Struct('<8sII6Q')
+
+# 半径按 uint32 存储，单条记录的长度不能超过该值
+_MAX_RECORD_LENGTH = (1 << 32) - 1
+
+
+def _little_endian(values: array) -> bytes:
+    if sys.byteorder != 'little':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _align(file, boundary: int = 8):
+    # 用 0 填充到 boundary 字节对齐，返回对齐后的位置
+    position = file.tell()
+    padding = -position % boundary
+    file.write(b'\0' * padding)
+    return position + padding
+
+
+def build_index(records, path, source_size: int = 0, source_mtime_ns: int = 0) -> int:
+    """
+    计算每条记录（str 或字节类对象）的回文标志和 Manacher 半径并写入索引文件，返回记录数
+    先写入临时文件再原子替换，构建中断不会留下不完整的索引，出错时删除临时文件
+    """
+    temporary = f"{path}.tmp"
+    try:
+        count = _write_index(records, temporary, source_size, source_mtime_ns)
+    except BaseException:
+        try:
+            os.unlink(temporary)
+        except FileNotFoundError:
+            pass
+        raise
+    os.replace(temporary, path)
+    return count
+
+
+def _write_index(records, path, source_size: int, source_mtime_ns: int) -> int:
+    lengths = array('Q')
+    flags = array('B')
+    starts = array('Q', [0])
+    with open(path, 'wb') as file:
+        file.write(b'\0' * _HEADER.size)
+        for record in records:
+            stats = CompactPalindromeStats.from_text(record)
+            if stats.length > _MAX_RECORD_LENGTH:
+                raise ValueError("单条记录过长，无法写入索引")
+            odd, even = _manacher(record)
+            file.write(_little_endian(array('I', odd)))
+            file.write(_little_endian(array('I', even)))
+            lengths.append(stats.length)
+            flags.append(stats.flags)
+            starts.append(starts[-1] + 2 * stats.length)
+
+        lengths_offset = _align(file)
+        file.write(_little_endian(lengths))
+        flags_offset = file.tell()
+        file.write(flags.tobytes())
+        starts_offset = _align(file)
+        file.write(_little_endian(starts))
+
+        file.seek(0)
+        file.write(_HEADER.pack(MAGIC, VERSION, 0, len(lengths), lengths_offset, flags_offset,
+                                starts_offset, source_size, source_mtime_ns))
+    return len(lengths)
+
+
+def _valid_layout(size: int, count: int, lengths_offset: int, flags_offset: int,
+                  starts_offset: int) -> bool:
+    # 文件头中的偏移与记录数是否与 build_index 写入的布局一致，且各个表都在文件范围内
+    return (lengths_offset >= _HEADER.size and (lengths_offset - _HEADER.size) % 8 == 0
+            and lengths_offset % 8 == 0
+            and flags_offset == lengths_offset + 8 * count
+            and starts_offset >= flags_offset + count and starts_offset % 8 == 0
+            and starts_offset + 8 * (count + 1) <= size)
+
+
+def _read_lines(corpus_path, encoding_errors: str):
+    # 按行读取语料，去掉行尾的 \n / \r\n（与命令行工具的处理方式一致）
+    with open(corpus_path, 'rb') as file:
+        for line in file:
+            text = line[:-1] if line.endswith(b'\n') else line
+            if text.endswith(b'\r'):
+                text = text[:-1]
+            yield text.decode('utf-8', encoding_errors)
+
+
+def build_index_from_file(corpus_path, index_path, encoding_errors: str = 'replace') -> int:
+    # 以语料文件的每一行为一条记录构建索引，并记录源文件的大小和修改时间
+    info = os.stat(corpus_path)
+    return build_index(_read_lines(corpus_path, encoding_errors), index_path,
+                       info.st_size, info.st_mtime_ns)
+
+
+class PalindromeDiskIndex:
+    """
+    只读的回文索引：打开时只解析文件头，各个表都是 mmap 上的视图，读取时才由操作系统按页加载
+    Examples:
+        >>> with PalindromeDiskIndex("corpus.palidx") as index:  # doctest: +SKIP
+        ...     index[0]['simple'], index.is_palindrome(0, 1, 4)
+        (False, True)
+    """
+
+    def __init__(self, path):
+        if sys.byteorder != 'little':
+            raise ValueError("索引文件只支持在小端序平台上读取")
+        self.path = path
+        with open(path, 'rb') as file:
+            size = os.fstat(file.fileno()).st_size
+            if size < _HEADER.size:
+                raise ValueError("不是回文索引文件")
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (magic, version, _, count, lengths_offset, flags_offset, starts_offset,
+         self.source_size, self.source_mtime_ns) = _HEADER.unpack_from(self._mmap)
+        if magic != MAGIC:
+            self._mmap.close()
+            raise ValueError("不是回文索引文件")
+        if version != VERSION:
+            self._mmap.close()
+            raise ValueError(f"不支持的索引版本: {version}")
+        # 文件被截断或损坏时抛出 ValueError（load_or_build 据此重新构建），而不是在 cast 时出错
+        if not _valid_layout(size, count, lengths_offset, flags_offset, starts_offset):
+            self._mmap.close()
+            raise ValueError("索引文件已损坏")
+
+        view = self._view = memoryview(self._mmap)
+        self._radii = view[_HEADER.size:lengths_offset].cast('I')
+        self._lengths = view[lengths_offset:lengths_offset + 8 * count].cast('Q')
+        self._flags = view[flags_offset:flags_offset + count]
+        self._starts = view[starts_offset:starts_offset + 8 * (count + 1)].cast('Q')
+        # 半径区的长度必须与起始表的最后一项一致
+        if self._starts[count] != len(self._radii):
+            self.close()
+            raise ValueError("索引文件已损坏")
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def __getitem__(self, record: int) -> CompactPalindromeStats:
+        # 第 record 条记录的统计结果
+        return CompactPalindromeStats(self._lengths[record], self._flags[record])
+
+    def __iter__(self):
+        for length, flags in zip(self._lengths, self._flags):
+            yield CompactPalindromeStats(length, flags)
+
+    def record_index(self, record: int) -> PalindromeIndex:
+        # 第 record 条记录的子串回文查询索引（直接使用 mmap 中的半径）
+        start = self._starts[record]
+        length = self._lengths[record]
+        return PalindromeIndex.from_radii(self._radii[start:start + length],
+                                          self._radii[start + length:start + 2 * length])
+
+    def is_palindrome(self, record: int, start: int = 0, end: int = None) -> bool:
+        # 第 record 条记录的子串 [start:end] 是否为回文，遵循切片语义
+        return self.record_index(record).is_palindrome(start, end)
+
+    def count(self, flag) -> int:
+        # 统计包含指定标志的记录数
+        if np is not None:
+            return int(np.count_nonzero(np.frombuffer(self._flags, dtype=np.uint8) & flag))
+        return sum(1 for flags in self._flags if flags & flag)
+
+    def is_stale(self, corpus_path) -> bool:
+        # 源文件的大小或修改时间与构建时不同，则索引已过期
+        info = os.stat(corpus_path)
+        return (info.st_size, info.st_mtime_ns) != (self.source_size, self.source_mtime_ns)
+
+    def close(self):
+        # 调用前需要先释放 record_index 返回的索引，否则 mmap 无法关闭
+        for view in (self._radii, self._lengths, self._flags, self._starts, self._view):
+            view.release()
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def load_or_build(corpus_path, index_path, encoding_errors: str = 'replace') -> PalindromeDiskIndex:
+    # 索引存在且未过期时直接打开，否则先重新构建
+    if os.path.exists(index_path):
+        try:
+            index = PalindromeDiskIndex(index_path)
+        except ValueError:
+            pass
+        else:
+            if not index.is_stale(corpus_path):
+                return index
+            index.close()
+    build_index_from_file(corpus_path, index_path, encoding_errors)
+    return PalindromeDiskIndex(index_path)
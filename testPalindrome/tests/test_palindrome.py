@@ -1,10 +1,37 @@
+from array import array
+import json
+import pickle
+import random
+import re
+import tracemalloc
+import unicodedata
+
 import pytest
 from src.palindrome import (
     is_palindrome_simple,
     is_palindrome_ignore_case,
     is_palindrome_with_whitespace,
     is_palindrome_recursive,
-    palindrome_stats
+    palindrome_stats,
+    is_palindrome_many,
+    is_palindrome_file,
+    PalindromeFlag,
+    CompactPalindromeStats,
+    PalindromeStatsArray,
+    maximal_palindromes,
+    longest_palindrome_span,
+    longest_palindromic_substring,
+    PalindromicTree,
+    PalindromeIndex,
+    get_normalizer,
+    palindrome_pairs,
+    palindrome_mismatch_distance,
+    palindrome_edit_distance,
+    is_palindrome_k_mismatch,
+    is_palindrome_k_edit,
+    palindrome_distance_many,
+    stream_palindromes,
+    PalindromeBuffer,
 )
 
 
@@ -84,6 +111,13 @@ class TestPalindromeIgnoreCase:
         result = is_palindrome_ignore_case(text)
         assert result == expected, f"is_palindrome_ignore_case('{text}') 应返回 {expected}"
 
+    def test_final_sigma_far_context(self):
+        # Σ 与决定其小写形式的字符之间隔着任意多个 case-ignorable 字符，且跨越多个块
+        core = 'x' * 4000 + 'AΣ' + "'" * 200 + 'b'
+        text = core + core[::-1]
+        assert is_palindrome_ignore_case(text) is True
+        assert is_palindrome_ignore_case(text) is (text.lower() == text.lower()[::-1])
+
     @pytest.mark.slow
     def test_is_palindrome_ignore_case_long_string(self):
         # 测试长字符串（性能测试）
@@ -141,6 +175,14 @@ class TestPalindromeRecursive:
         result = is_palindrome_recursive(text)
         assert result == expected, f"is_palindrome_recursive('{text}') 应返回 {expected}"
 
+    @pytest.mark.parametrize("position", [0, 1, 4095, 4096, 250000, 499999])
+    def test_is_palindrome_recursive_long_input(self, position):
+        # 长输入不会触发 RecursionError，任意位置的不匹配都能发现
+        text = "ab" * 250000 + "ba" * 250000
+        assert is_palindrome_recursive(text) is True
+        broken = text[:position] + "x" + text[position + 1:]
+        assert is_palindrome_recursive(broken) is False
+
     @pytest.mark.parametrize("invalid_input", [123, None, 3.14, [], {}])
     def test_is_palindrome_recursive_invalid_input(self, invalid_input):
         # 测试递归方法的无效输入
@@ -188,6 +230,71 @@ class TestPalindromeStats:
         assert result['is_single_char'] is True
         assert result['is_empty'] is False
 
+    @pytest.mark.parametrize("text", [
+        "", "a", "racecar", "Racecar", "  Level ", "A man, a plan, a canal: Panama",
+        "hello", "ΣΑΣ", "İi̇", "ab" * 5000 + "ba" * 5000,
+    ])
+    def test_palindrome_stats_matches_checkers(self, text):
+        # 单次遍历得到的标志与各判断函数一致
+        result = palindrome_stats(text)
+        assert result['simple'] is is_palindrome_simple(text)
+        assert result['ignore_case'] is is_palindrome_ignore_case(text)
+        assert result['with_whitespace'] is is_palindrome_with_whitespace(text)
+        assert result['recursive'] is is_palindrome_recursive(text)
+
+    def test_palindrome_stats_dict_compatible(self):
+        # 与 dict 兼容：键、比较、转换
+        result = palindrome_stats("Level")
+        expected = {
+            'original': "Level", 'length': 5, 'simple': False, 'ignore_case': True,
+            'with_whitespace': True, 'recursive': False, 'reversed': "leveL",
+            'is_empty': False, 'is_single_char': False,
+        }
+        assert result == expected
+        assert dict(result) == expected
+        assert result.to_dict() == expected
+        assert sorted(result.keys()) == sorted(expected)
+        assert 'reversed' in result
+        assert result.get('missing') is None
+        with pytest.raises(KeyError):
+            result['missing']
+
+    def test_palindrome_stats_lazy(self):
+        # 长输入只读取非标志字段时不计算回文标志；短输入构建时直接算出全部字段
+        text = "ab" * 5000 + "ba" * 5000
+        result = palindrome_stats(text)
+        assert result['length'] == len(text)
+        assert result._flags is None
+        assert result['simple'] is True
+        assert result._flags is not None
+        short = palindrome_stats("racecar")
+        assert dict.__len__(short) == len(short.KEYS)
+
+    @pytest.mark.parametrize("text", ["Level", "ab" * 5000 + "ba" * 5000])
+    def test_palindrome_stats_clear(self, text):
+        # clear 后没有任何字段，也不会补算按需字段
+        result = palindrome_stats(text)
+        result.clear()
+        assert result == {} and len(result) == 0 and 'simple' not in result
+        with pytest.raises(KeyError):
+            result['simple']
+        result['note'] = 1
+        assert result.to_dict() == {'note': 1}
+
+    def test_palindrome_stats_is_dict(self):
+        # 是 dict 的子类：可以直接 json.dumps、修改、序列化
+        result = palindrome_stats("abba")
+        assert isinstance(result, dict)
+        assert json.loads(json.dumps(result)) == result.to_dict()
+        assert list(json.loads(json.dumps(palindrome_stats("abba")))) == list(result.KEYS)
+        result['note'] = "checked"
+        assert result['note'] == "checked" and len(result) == len(result.KEYS) + 1
+        del result['reversed']
+        assert 'reversed' not in result
+        assert result.pop('simple') is True
+        copied = pickle.loads(pickle.dumps(result))
+        assert copied == result and isinstance(copied, type(result))
+
     @pytest.mark.parametrize("invalid_input", [123, None])
     def test_palindrome_stats_invalid_input(self, invalid_input):
         # 测试无效输入
@@ -195,6 +302,812 @@ class TestPalindromeStats:
             palindrome_stats(invalid_input)
 
 
+class TestPalindromeMany:
+    # 测试批量回文判断
+
+    SAMPLES = [
+        "racecar", "Racecar", "hello", "", "a", "ab",
+        "A man, a plan, a canal: Panama", "  Level  ", "12:21",
+        "上海自来水来自海上", "été", "Ωmega", "abc" * 50 + "cba" * 50,
+        "\t Abba\u3000", " " * 80, "a\x00a", "a\x00b", "ΣoΣ", "x" * 65 + "y",
+    ]
+
+    @pytest.mark.parametrize("mode, checker", [
+        ('simple', is_palindrome_simple),
+        ('ignore_case', is_palindrome_ignore_case),
+        ('with_whitespace', is_palindrome_with_whitespace),
+        ('recursive', is_palindrome_recursive),
+    ])
+    def test_matches_single_checkers(self, mode, checker):
+        # 批量结果必须与逐个调用完全一致
+        expected = [checker(text) for text in self.SAMPLES]
+        assert list(is_palindrome_many(self.SAMPLES, mode=mode)) == expected
+
+    def test_small_chunks_and_generator_input(self):
+        # 分批打包与生成器输入
+        texts = (text for text in self.SAMPLES)
+        expected = [is_palindrome_simple(text) for text in self.SAMPLES]
+        assert list(is_palindrome_many(texts, chunk_size=2)) == expected
+
+    def test_empty_input(self):
+        assert len(is_palindrome_many([])) == 0
+
+    def test_invalid_arguments(self):
+        with pytest.raises(ValueError):
+            is_palindrome_many(["abc"], mode='unknown')
+        with pytest.raises(TypeError, match="输入必须是字符串"):
+            is_palindrome_many(["abc", 123])
+
+    def test_without_numpy(self, monkeypatch):
+        # 未安装 NumPy 时退化为逐个比较，结果不变
+        import src.palindrome as palindrome_module
+        monkeypatch.setattr(palindrome_module, "np", None)
+        expected = [is_palindrome_ignore_case(text) for text in self.SAMPLES]
+        assert is_palindrome_many(self.SAMPLES, mode='ignore_case') == expected
+
+
+class TestMirrorEngine:
+    # 测试双指针引擎：小块尺寸下与整体清洗后比较的结果一致
+
+    ALPHABET = "aAbB İΣσς,.\t1"
+
+    @staticmethod
+    def _reference(text, mode):
+        # 原始实现：整体清洗后反转比较
+        if mode == 'ignore_case':
+            cleaned = text.lower().strip()
+        elif mode == 'with_whitespace':
+            cleaned = re.sub(r'[^a-zA-Z0-9]', '', text.lower())
+        else:
+            cleaned = text
+        return cleaned == cleaned[::-1]
+
+    @pytest.mark.parametrize("mode, checker", [
+        ('simple', is_palindrome_recursive),
+        ('ignore_case', is_palindrome_ignore_case),
+        ('with_whitespace', is_palindrome_with_whitespace),
+    ])
+    def test_random_inputs_small_blocks(self, monkeypatch, mode, checker):
+        import src.palindrome as palindrome_module
+        monkeypatch.setattr(palindrome_module, "_MIRROR_BLOCK_SIZE", 3)
+        rng = random.Random(2024)
+        for _ in range(2000):
+            half = ''.join(rng.choice(self.ALPHABET) for _ in range(rng.randint(0, 12)))
+            middle = rng.choice(["", "x", " ", "Bb"])
+            text = half + middle + half[::-1]
+            if rng.random() < 0.5:
+                text = ''.join(rng.choice([c, c.swapcase(), c + " "]) for c in text)
+            assert checker(text) == self._reference(text, mode), repr(text)
+
+    def test_long_inputs(self):
+        # 超过默认递归深度的输入
+        text = "ab" * 50000 + "a" + "ba" * 50000
+        assert is_palindrome_recursive(text) is True
+        assert is_palindrome_ignore_case("  " + text.upper() + "\n") is True
+        assert is_palindrome_with_whitespace(", ".join(text)) is True
+        assert is_palindrome_recursive("x" + text) is False
+
+    def test_whitespace_only(self):
+        assert is_palindrome_ignore_case(" \t\n " * 5000) is True
+        assert is_palindrome_with_whitespace(",. " * 5000) is True
+
+    def test_block_size_boundary(self):
+        # 不超过块大小的输入整体清洗后比较，更长的输入逐块比较，两边结果一致
+        from src.palindrome import _MIRROR_BLOCK_SIZE
+        for size in (_MIRROR_BLOCK_SIZE - 1, _MIRROR_BLOCK_SIZE, _MIRROR_BLOCK_SIZE + 1):
+            half = ("AbΣ, " * size)[:(size - 1) // 2]
+            text = half + "x" * (size - 2 * len(half)) + half[::-1]
+            assert len(text) == size
+            for mode, checker in (('ignore_case', is_palindrome_ignore_case),
+                                  ('with_whitespace', is_palindrome_with_whitespace)):
+                assert checker(text) == self._reference(text, mode)
+                assert checker(text + "z") == self._reference(text + "z", mode)
+
+
+class TestPalindromeFile:
+    # 测试基于 mmap 的文件回文判断
+
+    @pytest.fixture(autouse=True)
+    def small_blocks(self, monkeypatch):
+        # 使用很小的块，覆盖跨块和 UTF-8 多字节字符被切分的情况
+        import src.palindrome as palindrome_module
+        monkeypatch.setattr(palindrome_module, "_FILE_BLOCK_SIZE", 5)
+
+    @pytest.mark.parametrize("content, mode, expected", [
+        ("racecar", 'simple', True),
+        ("Racecar", 'simple', False),
+        ("上海自来水来自海上", 'simple', True),
+        ("上海自来水来自海下", 'simple', False),
+        ("  RaceCar\n", 'ignore_case', True),
+        ("ΣΑΣ", 'ignore_case', False),
+        ("ΑΣΑ", 'ignore_case', True),
+        ("A man, a plan, a canal: Panama", 'with_whitespace', True),
+        ("Was it a car or a cat I saw?\n", 'with_whitespace', True),
+        ("Hello, world!", 'with_whitespace', False),
+        ("abba", 'recursive', True),
+    ])
+    def test_is_palindrome_file(self, tmp_path, content, mode, expected):
+        path = tmp_path / "data.txt"
+        path.write_text(content, encoding="utf-8")
+        assert is_palindrome_file(path, mode=mode) is expected
+
+    @pytest.mark.parametrize("mode, checker", [
+        ('simple', is_palindrome_simple),
+        ('ignore_case', is_palindrome_ignore_case),
+        ('with_whitespace', is_palindrome_with_whitespace),
+    ])
+    def test_matches_string_checkers(self, tmp_path, mode, checker):
+        rng = random.Random(7)
+        path = tmp_path / "data.txt"
+        for _ in range(300):
+            half = ''.join(rng.choice("aÄé海 ,Σ\n") for _ in range(rng.randint(0, 10)))
+            text = half + rng.choice(["", "ß", "b"]) + half[::-1]
+            path.write_text(text, encoding="utf-8")
+            assert is_palindrome_file(path, mode=mode) == checker(text), repr(text)
+
+    def test_final_sigma_far_context(self, tmp_path):
+        # Σ 的上下文超出初始预读窗口时扩大窗口
+        core = 'x' * 40 + 'AΣ' + "'" * 300 + 'b'
+        path = tmp_path / "data.txt"
+        path.write_text(core + core[::-1], encoding="utf-8")
+        assert is_palindrome_file(path, mode='ignore_case') is True
+
+    def test_empty_file(self, tmp_path):
+        path = tmp_path / "empty.txt"
+        path.write_bytes(b"")
+        assert is_palindrome_file(path) is True
+
+    def test_invalid_arguments(self, tmp_path):
+        path = tmp_path / "data.bin"
+        path.write_bytes(b"\xff\xfe\xff")
+        with pytest.raises(UnicodeDecodeError):
+            is_palindrome_file(path)
+        with pytest.raises(ValueError):
+            is_palindrome_file(path, mode='unknown')
+
+
+class TestCompactPalindromeStats:
+    # 测试紧凑统计结果与按列存储容器
+
+    TEXTS = ["", "a", "racecar", "Level", "A man, a plan, a canal: Panama", "hello", "ΣΑΣ"]
+
+    @pytest.mark.parametrize("text", TEXTS)
+    def test_matches_palindrome_stats(self, text):
+        compact = CompactPalindromeStats.from_text(text)
+        assert compact.to_dict(text) == palindrome_stats(text)
+        assert palindrome_stats(text).compact() == compact
+
+    def test_flags_and_slots(self):
+        compact = CompactPalindromeStats.from_text("Level")
+        assert compact.flags == PalindromeFlag.IGNORE_CASE | PalindromeFlag.WITH_WHITESPACE
+        assert compact['length'] == 5
+        assert compact['ignore_case'] is True
+        assert 'original' not in compact.to_dict()
+        assert not hasattr(compact, '__dict__')
+        with pytest.raises(KeyError):
+            compact['original']
+
+    def test_stats_array(self):
+        stats_array = PalindromeStatsArray(self.TEXTS)
+        assert len(stats_array) == len(self.TEXTS)
+        assert stats_array[2] == CompactPalindromeStats.from_text("racecar")
+        assert list(stats_array.to_dicts()) == [
+            CompactPalindromeStats.from_text(text).to_dict() for text in self.TEXTS
+        ]
+        assert stats_array.count(PalindromeFlag.SIMPLE) == 4
+        stats_array.append("abba")
+        assert stats_array[-1]['simple'] is True
+
+    def test_stats_array_numpy(self):
+        np = pytest.importorskip("numpy")
+        lengths, flags = PalindromeStatsArray(self.TEXTS).as_numpy()
+        assert lengths.tolist() == [len(text) for text in self.TEXTS]
+        assert np.count_nonzero(flags & PalindromeFlag.EMPTY) == 1
+
+    def test_invalid_input(self):
+        with pytest.raises(TypeError):
+            CompactPalindromeStats.from_text(None)
+
+
+class TestManacher:
+    # 测试基于 Manacher 算法的最长回文子串
+
+    @staticmethod
+    def _brute_force_longest(cleaned):
+        # 暴力求清洗后字符串中最长回文子串的长度
+        best = 0
+        for i in range(len(cleaned)):
+            for j in range(i + 1, len(cleaned) + 1):
+                if j - i > best and is_palindrome_simple(cleaned[i:j]):
+                    best = j - i
+        return best
+
+    @pytest.mark.parametrize("text, mode, expected", [
+        ("", 'simple', ""),
+        ("a", 'simple', "a"),
+        ("babad", 'simple', "bab"),
+        ("cbbd", 'simple', "bb"),
+        ("forgeeksskeegfor", 'simple', "geeksskeeg"),
+        ("xyz Racecar!", 'simple', "aceca"),
+        ("xyz Racecar!", 'ignore_case', "Racecar"),
+        ("  Abba  ", 'ignore_case', "Abba"),
+        ("Was it a car or a cat I saw?", 'with_whitespace', "Was it a car or a cat I saw"),
+        ("Say: A man, a plan, a canal: Panama!", 'with_whitespace', "A man, a plan, a canal: Panama"),
+    ])
+    def test_longest_palindromic_substring(self, text, mode, expected):
+        assert longest_palindromic_substring(text, mode) == expected
+
+    @staticmethod
+    def _clean(text, mode):
+        # 参照实现：按模式清洗（ignore_case 的 strip 只影响整个字符串的首尾）
+        if mode == 'simple':
+            return text
+        if mode == 'ignore_case':
+            return text.lower()
+        return re.sub(r'[^a-zA-Z0-9]', '', text.lower())
+
+    @pytest.mark.parametrize("mode", ['simple', 'ignore_case', 'with_whitespace'])
+    def test_random_against_brute_force(self, mode):
+        rng = random.Random(11)
+        for _ in range(300):
+            text = ''.join(rng.choice("abAB ,") for _ in range(rng.randint(0, 14)))
+            start, end = longest_palindrome_span(text, mode)
+            piece = self._clean(text[start:end], mode)
+            cleaned = self._clean(text, mode)
+            if mode == 'ignore_case':
+                cleaned = cleaned.strip()
+            assert piece == piece[::-1], repr(text)
+            assert len(piece) == self._brute_force_longest(cleaned), repr(text)
+
+    def test_offsets_with_expanding_lowercase(self):
+        # "İ" 转小写后变成 "i" 加组合点两个字符，区间映射回完整的原字符，且按模式判断一定是回文
+        assert longest_palindromic_substring("xİİx", mode='ignore_case') == "x"
+        assert longest_palindromic_substring("İab", mode='with_whitespace') == "İ"
+        assert longest_palindromic_substring("İ", mode='ignore_case') == ""
+        assert longest_palindromic_substring("xΣaΣx", mode='ignore_case') == "xΣaΣx"
+        assert longest_palindromic_substring("xΣaΣ", mode='ignore_case') == "x"
+
+    @pytest.mark.parametrize("mode, normalization, checker", [
+        ('ignore_case', 'ascii', is_palindrome_ignore_case),
+        ('with_whitespace', 'ascii', is_palindrome_with_whitespace),
+        ('ignore_case', 'unicode', lambda text: is_palindrome_ignore_case(text, 'unicode')),
+        ('with_whitespace', 'unicode', lambda text: is_palindrome_with_whitespace(text, 'unicode')),
+    ])
+    def test_spans_are_palindromes_in_mode(self, mode, normalization, checker):
+        # 含有 İ / Σ / ß / 组合字符等不可单独清洗的字符时，返回的区间按对应模式判断仍是回文
+        rng = random.Random(7)
+        for _ in range(300):
+            text = ''.join(rng.choice("aAİΣσßsﬁ e\u0301é,") for _ in range(rng.randint(0, 10)))
+            start, end = longest_palindrome_span(text, mode, normalization)
+            assert start == end or checker(text[start:end]), repr(text)
+            for start, end in maximal_palindromes(text, mode, normalization):
+                assert checker(text[start:end]), repr(text)
+
+    def test_unicode_normalization_and_bytes(self):
+        assert longest_palindromic_substring("xＡbａy", 'ignore_case', 'unicode') == "Ａbａ"
+        assert longest_palindromic_substring("xStraße ssarts!", 'with_whitespace', 'unicode') == "Straße ssarts"
+        assert longest_palindromic_substring(b"xyAbbaz", mode='ignore_case') == b"Abba"
+        assert longest_palindromic_substring(bytearray(b"A-b:a!"), mode='with_whitespace') == b"A-b:a"
+        assert list(maximal_palindromes(memoryview(b"aba"))) == [(0, 1), (0, 3), (2, 3)]
+        with pytest.raises(ValueError):
+            longest_palindromic_substring(b"abba", 'ignore_case', 'unicode')
+
+    def test_maximal_palindromes(self):
+        assert list(maximal_palindromes("abba")) == [(0, 1), (1, 2), (0, 4), (2, 3), (3, 4)]
+        assert list(maximal_palindromes("")) == []
+        spans = list(maximal_palindromes("A-b:a", mode='with_whitespace'))
+        assert spans == [(0, 1), (0, 5), (4, 5)]
+
+    def test_invalid_arguments(self):
+        with pytest.raises(TypeError):
+            longest_palindromic_substring(None)
+        with pytest.raises(ValueError):
+            longest_palindrome_span("abc", mode='unknown')
+
+
+class TestPalindromicTree:
+    # 测试回文树
+
+    @staticmethod
+    def _brute_force_occurrences(text):
+        counts = {}
+        for i in range(len(text)):
+            for j in range(i + 1, len(text) + 1):
+                piece = text[i:j]
+                if piece == piece[::-1]:
+                    counts[piece] = counts.get(piece, 0) + 1
+        return counts
+
+    @pytest.mark.parametrize("text", ["", "a", "aaaa", "abba", "abacaba", "banana", "上海自来水来自海上"])
+    def test_against_brute_force(self, text):
+        tree = PalindromicTree.from_string(text)
+        expected = self._brute_force_occurrences(text)
+        assert tree.distinct_count == len(expected)
+        assert sorted(tree.palindromes()) == sorted(expected)
+        assert tree.occurrences() == expected
+        assert tree.text == text
+
+    def test_random_strings(self):
+        rng = random.Random(5)
+        for _ in range(200):
+            text = ''.join(rng.choice("abc") for _ in range(rng.randint(0, 30)))
+            assert PalindromicTree(text).occurrences() == self._brute_force_occurrences(text)
+
+    def test_incremental_append(self):
+        # 每次追加后返回最长回文后缀的长度
+        tree = PalindromicTree()
+        lengths = [tree.append(char) for char in "abacaba"]
+        assert lengths == [1, 1, 3, 1, 3, 5, 7]
+        assert list(tree.suffix_lengths) == lengths
+
+    def test_invalid_input(self):
+        tree = PalindromicTree()
+        with pytest.raises(TypeError):
+            tree.append("ab")
+        with pytest.raises(TypeError):
+            PalindromicTree.from_string(None)
+
+
+class TestPalindromeIndex:
+    # 测试子串回文查询索引
+
+    @pytest.mark.parametrize("text", ["", "a", "abacaba", "xabbay", "aaaa", "abcde"])
+    def test_all_ranges(self, text):
+        # 包括负数和越界下标在内，结果与切片后判断一致
+        index = PalindromeIndex(text)
+        bound = len(text) + 2
+        for start in range(-bound, bound):
+            for end in range(-bound, bound):
+                expected = is_palindrome_simple(text[start:end])
+                assert index.is_palindrome(start, end) is expected, (text, start, end)
+
+    def test_query_many(self):
+        rng = random.Random(3)
+        text = ''.join(rng.choice("ab") for _ in range(200))
+        index = PalindromeIndex(text)
+        pairs = [(rng.randint(-210, 210), rng.randint(-210, 210)) for _ in range(2000)]
+        expected = [is_palindrome_simple(text[start:end]) for start, end in pairs]
+        assert [bool(flag) for flag in index.query_many(pairs)] == expected
+        assert len(index.query_many([])) == 0
+        assert list(PalindromeIndex("").query_many([(0, 0)])) == [True]
+
+    def test_query_many_without_numpy(self, monkeypatch):
+        import src.palindrome as palindrome_module
+        monkeypatch.setattr(palindrome_module, "np", None)
+        index = PalindromeIndex("xabbay")
+        assert index.query_many([(1, 5), (0, 5)]) == [True, False]
+
+    def test_whole_string_default(self):
+        assert PalindromeIndex("racecar").is_palindrome() is True
+        assert len(PalindromeIndex("racecar")) == 7
+
+    def test_invalid_input(self):
+        with pytest.raises(TypeError):
+            PalindromeIndex(None)
+
+
+class TestNormalization:
+    # 测试 ASCII / Unicode 两种清洗方式
+
+    @pytest.mark.parametrize("text, ascii_expected, unicode_expected", [
+        ("A man, a plan, a canal: Panama", True, True),
+        ("上海自来水，来自海上", True, True),
+        ("上海自来水，来自海下", True, False),  # ASCII 模式会丢弃所有中文字符
+        ("ＥＶ, ve", False, True),  # 全角字符经 NFKC 统一
+        ("Ésope reste ici et se reposé", True, True),
+        ("été ÉTÉ", True, True),
+        ("éé", True, True),  # 预组合字符与组合序列等价
+        ("Straße, essartS", False, True),  # casefold: ß -> ss
+    ])
+    def test_with_whitespace(self, text, ascii_expected, unicode_expected):
+        assert is_palindrome_with_whitespace(text) is ascii_expected
+        assert is_palindrome_with_whitespace(text, normalization='unicode') is unicode_expected
+
+    @pytest.mark.parametrize("text, expected", [
+        ("  Ｅｖｅ ", True),
+        ("  ＥｖA ", False),
+        ("ΣΑς", True),  # casefold 后 σ 与 ς 相同
+        ("Straße essarts", True),
+    ])
+    def test_ignore_case_unicode(self, text, expected):
+        assert is_palindrome_ignore_case(text, normalization='unicode') is expected
+
+    @pytest.mark.parametrize("mode", ['ignore_case', 'with_whitespace'])
+    def test_unicode_blocks_match_whole_string(self, monkeypatch, mode):
+        # 小块切分时与整体清洗的结果一致（包括组合字符被切到块边界的情况）
+        import src.palindrome as palindrome_module
+        monkeypatch.setattr(palindrome_module, "_MIRROR_BLOCK_SIZE", 3)
+        normalizer = get_normalizer(mode, 'unicode')
+        rng = random.Random(13)
+        alphabet = ["a", "B", "é", "é", "ß", "Ｅ", "海", " ", ",", "́", "ﬁ", "Σ"]
+        for _ in range(2000):
+            half = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 8)))
+            text = half + rng.choice(["", "x", "́"]) + half[::-1]
+            cleaned = normalizer(text)
+            expected = cleaned == cleaned[::-1]
+            assert normalizer.is_palindrome(text) is expected, repr(text)
+
+    @staticmethod
+    def _mirrored_units(rng, script: str, count: int) -> str:
+        # 以完整的字符序列为单位镜像，整体清洗后是回文
+        if script == 'kana':
+            # 半角浊音符 ﾞ / 半浊音符 ﾟ 的组合类为 0，NFKC 后与前面的假名组合
+            units = [rng.choice(["ｶﾞ", "ﾊﾟ", "ｷ", "ﾎﾟ", "ﾀ"]) for _ in range(count)]
+        else:
+            # NFD 形式的 Hangul 音节：V / T 字母的组合类为 0，但会与前面的字母组合
+            units = [unicodedata.normalize('NFD', chr(rng.randint(0xAC00, 0xD7A3)))
+                     for _ in range(count)]
+        return ''.join(units) + ''.join(reversed(units))
+
+    @pytest.mark.parametrize("script", ['kana', 'hangul'])
+    @pytest.mark.parametrize("mode", ['ignore_case', 'with_whitespace'])
+    def test_composing_starters_at_default_block_size(self, script, mode):
+        # 默认块大小下不在会被 NFKC 组合的起始字符之前切分
+        normalizer = get_normalizer(mode, 'unicode')
+        rng = random.Random(17)
+        for _ in range(10):
+            text = self._mirrored_units(rng, script, rng.randint(3000, 6000))
+            assert normalizer.is_palindrome(text) is True
+            cleaned = normalizer(text)
+            assert cleaned == cleaned[::-1]
+
+    def test_no_safe_cut_reads_whole_middle(self):
+        # 整段都是组合字符、找不到安全切分位置时一次读完中段
+        text = "a" + "\u0301\u0323" * 5000 + "a"
+        cleaned = get_normalizer('ignore_case', 'unicode')(text)
+        assert is_palindrome_ignore_case(text, normalization='unicode') is (cleaned == cleaned[::-1])
+        marks = "\u0301" * 9000
+        assert is_palindrome_ignore_case("ｶﾞ" + marks + "ｶﾞ", normalization='unicode') is True
+        assert is_palindrome_ignore_case("ｶﾞ" + marks + "ｶ", normalization='unicode') is False
+
+    @pytest.mark.parametrize("script", ['kana', 'hangul'])
+    def test_composing_starters_in_file(self, tmp_path, script):
+        # 文件按默认块大小（1 MB）读取时同样在安全位置切分
+        path = tmp_path / "data.txt"
+        text = self._mirrored_units(random.Random(19), script, 120_000)
+        path.write_text(text, encoding="utf-8")
+        assert path.stat().st_size > 1 << 20
+        assert is_palindrome_file(path, mode='with_whitespace', normalization='unicode') is True
+        assert is_palindrome_file(path, mode='ignore_case', normalization='unicode') is True
+
+    def test_batch_and_file(self, tmp_path):
+        texts = ["上海自来水，来自海下", "ＥＶ, ve"]
+        assert list(is_palindrome_many(texts, mode='with_whitespace')) == [True, False]
+        assert list(is_palindrome_many(texts, mode='with_whitespace',
+                                       normalization='unicode')) == [False, True]
+        path = tmp_path / "data.txt"
+        path.write_text("Ｅｖｅ, évé!", encoding="utf-8")
+        assert is_palindrome_file(path, mode='with_whitespace', normalization='unicode') is False
+        path.write_text("Ｅｖé, évE!", encoding="utf-8")
+        assert is_palindrome_file(path, mode='with_whitespace', normalization='unicode') is True
+
+    def test_invalid_normalization(self):
+        with pytest.raises(ValueError):
+            get_normalizer('ignore_case', 'latin1')
+        with pytest.raises(ValueError):
+            is_palindrome_with_whitespace("abc", normalization='latin1')
+
+
+class TestBytesInput:
+    # 测试 bytes / bytearray / memoryview 输入
+
+    @pytest.mark.parametrize("data, simple, ignore_case, with_whitespace", [
+        (b"racecar", True, True, True),
+        (b"RaceCar", False, True, True),
+        (b" Level  ", False, True, True),
+        (b"A man, a plan, a canal: Panama", False, False, True),
+        (b"\xff\x00\xff", True, True, True),
+        (b"ab\xe9\xffba", False, False, True),  # 非 ASCII 字节在 with_whitespace 模式下被丢弃
+        (b"", True, True, True),
+    ])
+    def test_matches_decoded_text(self, data, simple, ignore_case, with_whitespace):
+        for value in (data, bytearray(data), memoryview(data)):
+            assert is_palindrome_simple(value) is simple
+            assert is_palindrome_recursive(value) is simple
+            assert is_palindrome_ignore_case(value) is ignore_case
+            assert is_palindrome_with_whitespace(value) is with_whitespace
+
+    def test_memoryview_slice_of_shared_buffer(self):
+        buffer = bytearray(b"xxabcbayy")
+        view = memoryview(buffer)[2:7]
+        assert is_palindrome_simple(view)
+        buffer[2] = ord('z')
+        assert not is_palindrome_simple(view)
+
+    def test_non_byte_format_is_cast(self):
+        values = array('H', [1, 2, 1])
+        assert is_palindrome_simple(values) is is_palindrome_simple(bytes(values))
+
+    @pytest.mark.parametrize("mode", ['simple', 'ignore_case', 'with_whitespace', 'recursive'])
+    def test_blocks_match_whole_buffer(self, monkeypatch, mode):
+        monkeypatch.setattr("src.palindrome._MIRROR_BLOCK_SIZE", 3)
+        rng = random.Random(13)
+        for _ in range(200):
+            data = bytes(rng.choice(b"aAbB ,\xff") for _ in range(rng.randint(0, 12)))
+            data = data + data[::-1] if rng.random() < 0.5 else data
+            cleaned = get_normalizer(mode)(memoryview(data))
+            assert get_normalizer(mode).is_palindrome(memoryview(data)) is (cleaned == cleaned[::-1])
+
+    def test_stats_and_batch(self):
+        stats = palindrome_stats(b"Abba")
+        assert stats['reversed'] == b"abbA"
+        assert not stats['simple'] and stats['ignore_case']
+        assert CompactPalindromeStats.from_text(bytearray(b"Abba")).flags == stats.compact().flags
+        results = is_palindrome_many([b"Abba", "Abba", memoryview(b"abc")], mode='ignore_case')
+        assert [bool(flag) for flag in results] == [True, True, False]
+        assert PalindromeIndex(b"xabbay").is_palindrome(1, 5)
+
+    def test_stats_do_not_keep_caller_buffer(self):
+        # original 保存为 bytes，不持有调用方缓冲区的导出
+        buffer = bytearray(b"Abba")
+        stats = palindrome_stats(buffer)
+        buffer.extend(b"xyz")
+        assert stats['original'] == b"Abba" and type(stats['original']) is bytes
+        assert stats['ignore_case'] and stats['reversed'] == b"abbA"
+        assert pickle.loads(pickle.dumps(palindrome_stats(memoryview(b"abc")))) == {
+            'original': b"abc", 'length': 3, 'simple': False, 'ignore_case': False,
+            'with_whitespace': False, 'recursive': False, 'reversed': b"cba",
+            'is_empty': False, 'is_single_char': False}
+
+    def test_unicode_normalization_rejects_bytes(self):
+        with pytest.raises(ValueError):
+            is_palindrome_ignore_case(b"abba", normalization='unicode')
+
+    def test_invalid_type(self):
+        with pytest.raises(TypeError, match="输入必须是字符串"):
+            is_palindrome_simple(12321)
+
+
+class TestPalindromePairs:
+    # 测试回文拼接对
+
+    @staticmethod
+    def _brute_force(words, check):
+        return sorted((i, j) for i in range(len(words)) for j in range(len(words))
+                      if i != j and check(words[i] + words[j]))
+
+    def test_example(self):
+        words = ["abcd", "dcba", "lls", "s", "sssll"]
+        assert sorted(palindrome_pairs(words)) == [(0, 1), (1, 0), (2, 4), (3, 2)]
+
+    def test_matches_brute_force(self):
+        rng = random.Random(15)
+        for _ in range(100):
+            words = [''.join(rng.choice("ab") for _ in range(rng.randint(0, 4)))
+                     for _ in range(rng.randint(0, 8))]
+            pairs = list(palindrome_pairs(words))
+            assert len(pairs) == len(set(pairs))
+            assert sorted(pairs) == self._brute_force(words, is_palindrome_simple)
+
+    def test_with_whitespace_mode(self):
+        words = ["A man, a plan,", " a canal: Panama", "Race", "car!", "xyz"]
+        pairs = sorted(palindrome_pairs(words, mode='with_whitespace'))
+        assert pairs == self._brute_force(words, is_palindrome_with_whitespace)
+        assert (0, 1) in pairs and (2, 3) in pairs
+
+    def test_ignore_case_and_bytes(self):
+        assert sorted(palindrome_pairs(["Ab", "bA", "a"], mode='ignore_case')) == [(0, 1), (0, 2), (1, 0), (2, 1)]
+        assert list(palindrome_pairs([b"ab", b"a"])) == [(0, 1)]
+
+    def test_is_lazy(self):
+        pairs = palindrome_pairs(["a"] * 1000)
+        assert next(pairs) == (1, 0)
+
+    def test_invalid_mode(self):
+        with pytest.raises(ValueError):
+            list(palindrome_pairs(["a"], mode='unknown'))
+
+
+class TestApproximatePalindrome:
+    # 测试 k 失配 / k 编辑近似回文
+
+    @staticmethod
+    def _edit_distance(text):
+        # 长度减去最长回文子序列长度（O(n²) 动态规划）
+        n = len(text)
+        if n == 0:
+            return 0
+        table = [[0] * n for _ in range(n)]
+        for i in range(n - 1, -1, -1):
+            table[i][i] = 1
+            for j in range(i + 1, n):
+                if text[i] == text[j]:
+                    table[i][j] = table[i + 1][j - 1] + 2
+                else:
+                    table[i][j] = max(table[i + 1][j], table[i][j - 1])
+        return n - table[0][n - 1]
+
+    def test_mismatch_matches_brute_force(self, monkeypatch):
+        monkeypatch.setattr("src.palindrome._MIRROR_BLOCK_SIZE", 3)
+        rng = random.Random(16)
+        for _ in range(200):
+            text = ''.join(rng.choice("abc") for _ in range(rng.randint(0, 15)))
+            expected = sum(a != b for a, b in zip(text[:len(text) // 2], text[::-1]))
+            assert palindrome_mismatch_distance(text) == expected
+            for k in range(4):
+                assert palindrome_mismatch_distance(text, limit=k) == min(expected, k + 1)
+                assert is_palindrome_k_mismatch(text, k) is (expected <= k)
+
+    def test_edit_matches_brute_force(self):
+        rng = random.Random(16)
+        for _ in range(200):
+            text = ''.join(rng.choice("abc") for _ in range(rng.randint(0, 15)))
+            expected = self._edit_distance(text)
+            assert palindrome_edit_distance(text) == expected
+            for k in range(4):
+                assert palindrome_edit_distance(text, limit=k) == min(expected, k + 1)
+                assert is_palindrome_k_edit(text, k) is (expected <= k)
+
+    def test_modes(self):
+        assert is_palindrome_k_mismatch("A man, a plan, a canal: Panamx", 1, mode='with_whitespace')
+        assert not is_palindrome_k_mismatch("A man, a plan, a canal: Panamx", 0, mode='with_whitespace')
+        assert palindrome_edit_distance(" RaceCar ", mode='ignore_case') == 0
+        assert palindrome_edit_distance("Racecars", mode='ignore_case') == 1
+        assert palindrome_mismatch_distance(b"abca") == 1
+
+    def test_long_near_palindrome(self):
+        rng = random.Random(7)
+        half = ''.join(rng.choice("acgt") for _ in range(50_000))
+        text = half + half[::-1]
+        noisy = text[:1000] + "x" + text[1000:70_000] + text[70_001:]
+        assert palindrome_edit_distance(noisy, limit=3) == 2
+        assert palindrome_mismatch_distance(noisy, limit=3) == 4
+        assert not is_palindrome_k_edit(noisy, 1)
+
+    def test_distance_many(self):
+        texts = ["abba", "abca", "abcd", "racecars"]
+        assert [int(d) for d in palindrome_distance_many(texts, 1)] == [0, 1, 2, 2]
+        assert [int(d) for d in palindrome_distance_many(texts, 1, metric='edit')] == [0, 1, 2, 1]
+
+    @pytest.mark.parametrize("call", [
+        lambda: palindrome_mismatch_distance("abc", limit=-1),
+        lambda: palindrome_edit_distance("abc", limit=-1),
+        lambda: palindrome_distance_many(["abc"], 1, metric='hamming'),
+        lambda: palindrome_distance_many(["abc"], 1, mode='unknown'),
+    ])
+    def test_invalid_arguments(self, call):
+        with pytest.raises(ValueError):
+            call()
+
+
+class TestStreamPalindromes:
+    # 测试分块流式查找极大回文
+
+    @staticmethod
+    def _expected(text, min_length, max_length):
+        # 在整个字符串上求极大回文，再按 max_length 截断
+        events = []
+        for start, end in maximal_palindromes(text):
+            length = end - start
+            if length > max_length:
+                trimmed = max_length if (length - max_length) % 2 == 0 else max_length - 1
+                start, length = start + (length - trimmed) // 2, trimmed
+            if length >= min_length:
+                events.append((start, length))
+        return events
+
+    @staticmethod
+    def _split(text, rng):
+        chunks, position = [], 0
+        while position < len(text):
+            size = rng.randint(0, 6)
+            chunks.append(text[position:position + size])
+            position += size
+        return chunks
+
+    def test_matches_whole_string(self):
+        rng = random.Random(17)
+        for _ in range(300):
+            text = ''.join(rng.choice("ab") for _ in range(rng.randint(0, 40)))
+            min_length = rng.randint(1, 6)
+            max_length = rng.randint(min_length, 12)
+            events = list(stream_palindromes(self._split(text, rng), min_length, max_length))
+            assert events == self._expected(text, min_length, max_length)
+
+    def test_palindrome_across_chunk_boundaries(self):
+        chunks = ["xyz", "ab", "c", "dcb", "a", "qrs"]
+        assert list(stream_palindromes(chunks, 4, 20)) == [(3, 7)]
+
+    def test_bytes_chunks(self):
+        chunks = [b"GATTA", bytearray(b"CAGGAC"), memoryview(b"TTAG")]
+        assert list(stream_palindromes(chunks, 6, 20)) == [(5, 6)]
+
+    def test_memory_is_bounded(self):
+        def endless():
+            for _ in range(5000):
+                yield "abcdefghij"
+            yield "jihgfedcba"
+
+        # 窗口不随输入增长：5 万字符的流，峰值内存远小于整个输入
+        tracemalloc.start()
+        events = list(stream_palindromes(endless(), 3, 8))
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        assert events == [(49996, 8)]
+        assert peak < 50_000
+
+    def test_empty_stream(self):
+        assert list(stream_palindromes([], 1, 5)) == []
+        assert list(stream_palindromes(["", ""], 1, 5)) == []
+
+    @pytest.mark.parametrize("min_length, max_length", [(0, 5), (5, 4)])
+    def test_invalid_lengths(self, min_length, max_length):
+        with pytest.raises(ValueError):
+            list(stream_palindromes(["abc"], min_length, max_length))
+
+
+class TestPalindromeBuffer:
+    # 测试可编辑回文缓冲区
+
+    def test_random_edits_match_string_model(self):
+        rng = random.Random(19)
+        buffer, model = PalindromeBuffer(seed=1), ""
+        for _ in range(2000):
+            operation = rng.random()
+            if operation < 0.4:
+                index = rng.randint(-2, len(model) + 2)
+                text = ''.join(rng.choice("ab") for _ in range(rng.randint(0, 3)))
+                buffer.insert(index, text)
+                position = slice(index, None).indices(len(model))[0]
+                model = model[:position] + text + model[position:]
+            elif operation < 0.6 and model:
+                start = rng.randint(0, len(model) - 1)
+                end = rng.randint(start, len(model))
+                buffer.delete(start, end)
+                model = model[:start] + model[end:]
+            elif operation < 0.8 and model:
+                index = rng.randrange(len(model))
+                text = rng.choice("ab")
+                buffer.replace(index, text)
+                model = model[:index] + text + model[index + 1:]
+            start, end = rng.randint(-3, len(model) + 1), rng.randint(-3, len(model) + 1)
+            assert buffer.is_palindrome(start, end) is is_palindrome_simple(model[start:end])
+            assert buffer.is_palindrome() is is_palindrome_simple(model)
+            assert len(buffer) == len(model)
+        assert str(buffer) == model
+
+    def test_editor_session(self):
+        buffer = PalindromeBuffer("A man a plan")
+        assert not buffer.is_palindrome()
+        buffer.delete(0, len(buffer))
+        buffer.insert(0, "never odd or even")
+        assert not buffer.is_palindrome()
+        buffer.delete(5)
+        buffer.delete(8)
+        buffer.delete(10)
+        assert str(buffer) == "neveroddoreven"
+        assert buffer.is_palindrome()
+        assert buffer[5] == "o" and buffer[-1] == "n"
+
+    def test_unicode(self):
+        buffer = PalindromeBuffer("上海自来水来自海上")
+        assert buffer.is_palindrome()
+        buffer.replace(4, "🙂")
+        assert buffer.is_palindrome()
+        buffer.replace(0, "下")
+        assert not buffer.is_palindrome() and buffer.is_palindrome(1, 8)
+
+    def test_long_buffer(self):
+        half = "abc" * 20000
+        buffer = PalindromeBuffer(half + half[::-1])
+        assert buffer.is_palindrome()
+        buffer.replace(100, "x")
+        assert not buffer.is_palindrome()
+        buffer.replace(len(buffer) - 101, "x")
+        assert buffer.is_palindrome()
+
+    def test_invalid_operations(self):
+        buffer = PalindromeBuffer("abc")
+        with pytest.raises(IndexError):
+            buffer.replace(2, "xy")
+        with pytest.raises(IndexError):
+            buffer.delete(3)
+        with pytest.raises(IndexError):
+            buffer[3]
+        with pytest.raises(TypeError, match="输入必须是字符串"):
+            buffer.insert(0, 1)
+
+
 # 测试夹具示例
 @pytest.fixture
 def common_palindromes():
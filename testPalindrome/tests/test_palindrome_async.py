@@ -0,0 +1,118 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+from src.palindrome import is_palindrome_simple, is_palindrome_with_whitespace
+from src.palindrome_async import check_stream
+
+
+LINES = ["racecar", "hello", "", "A man, a plan, a canal: Panama", "上海自来水来自海上",
+         "Level", b"abba", "x" * 1000 + "y"]
+
+
+async def _aiter(items, delay=0):
+    # 模拟从网络或队列中逐条到达的输入
+    for item in items:
+        if delay:
+            await asyncio.sleep(delay)
+        yield item
+
+
+def _collect(source, **kwargs):
+    async def run():
+        return [item async for item in check_stream(source, **kwargs)]
+    return asyncio.run(run())
+
+
+class TestCheckStream:
+    # 测试异步流式判断
+
+    @pytest.mark.parametrize("offload_threshold", [0, 10, 1 << 20])
+    def test_results_in_input_order(self, offload_threshold):
+        results = _collect(_aiter(LINES), mode='with_whitespace',
+                           offload_threshold=offload_threshold, concurrency=3)
+        assert results == [(line, is_palindrome_with_whitespace(line)) for line in LINES]
+
+    def test_plain_iterable_source(self):
+        results = _collect(iter(LINES))
+        assert [result for _, result in results] == [is_palindrome_simple(line) for line in LINES]
+
+    def test_custom_executors(self):
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            results = _collect(_aiter(LINES), offload_threshold=0, executor=executor)
+        assert [result for _, result in results] == [is_palindrome_simple(line) for line in LINES]
+
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            results = _collect(_aiter(LINES), mode='ignore_case', offload_threshold=100,
+                               executor=executor)
+        assert [result for _, result in results] == [True, False, True, False, True, True, True, False]
+
+    def test_backpressure_limits_items_in_flight(self):
+        pulled = 0
+        in_flight = []
+
+        async def source():
+            nonlocal pulled
+            for line in LINES * 5:
+                pulled += 1
+                yield line
+
+        async def run():
+            consumed = 0
+            async for _ in check_stream(source(), concurrency=3, offload_threshold=0):
+                consumed += 1
+                in_flight.append(pulled - consumed)
+                await asyncio.sleep(0.001)
+            return consumed
+
+        assert asyncio.run(run()) == len(LINES) * 5
+        assert max(in_flight) <= 3
+
+    def test_event_loop_not_blocked(self):
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0)
+
+        async def run():
+            task = asyncio.create_task(ticker())
+            big = "ab" * 500_000 + "ba" * 500_000
+            results = [result async for _, result in
+                       check_stream(_aiter([big] * 4), offload_threshold=1000)]
+            task.cancel()
+            return results
+
+        assert asyncio.run(run()) == [True] * 4
+        assert ticks > 0
+
+    def test_error_raised_at_its_position(self):
+        async def run():
+            seen = []
+            with pytest.raises(TypeError):
+                async for text, _ in check_stream(_aiter(["aa", 12321, "bb"])):
+                    seen.append(text)
+            return seen
+
+        assert asyncio.run(run()) == ["aa"]
+
+    def test_early_exit_cancels_pending(self):
+        async def run():
+            stream = check_stream(_aiter(LINES * 10), offload_threshold=0, concurrency=4)
+            first = await stream.__anext__()
+            await stream.aclose()
+            return first
+
+        assert asyncio.run(run()) == ("racecar", True)
+
+    @pytest.mark.parametrize("kwargs", [
+        {'mode': 'unknown'},
+        {'normalization': 'latin'},
+        {'concurrency': 0},
+        {'offload_threshold': -1},
+    ])
+    def test_invalid_arguments(self, kwargs):
+        with pytest.raises(ValueError):
+            _collect(_aiter(LINES), **kwargs)
@@ -0,0 +1,152 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from src.palindrome import palindrome_stats, is_palindrome_with_whitespace
+from src.palindrome_cache import PalindromeCache, memoize, cached_functions
+
+
+class FakeClock:
+    # 可手动推进的时钟
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestPalindromeCache:
+    # 测试缓存的淘汰与过期
+
+    def test_hit_and_miss(self):
+        cache = PalindromeCache(maxsize=2)
+        assert cache.get("a") == (False, None)
+        cache.put("a", True)
+        assert cache.get("a") == (True, True)
+        info = cache.info()
+        assert (info.hits, info.misses, info.currsize) == (1, 1, 1)
+
+    def test_lru_eviction(self):
+        cache = PalindromeCache(maxsize=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+        assert cache.get("b") == (False, None)
+        assert cache.get("a") == (True, 1)
+        assert cache.info().evictions == 1
+
+    def test_memory_limit(self):
+        cache = PalindromeCache(maxsize=None, max_bytes=300, size_of=lambda key, value: 100)
+        for key in "abcde":
+            cache.put(key, True)
+        info = cache.info()
+        assert info.currsize == 3
+        assert info.current_bytes == 300
+        assert info.evictions == 2
+
+    def test_oversized_entry_not_cached(self):
+        cache = PalindromeCache(max_bytes=10)
+        cache.put("a" * 100, True)
+        assert len(cache) == 0
+
+    def test_ttl(self):
+        clock = FakeClock()
+        cache = PalindromeCache(ttl=10, clock=clock)
+        cache.put("a", True)
+        clock.now = 9.9
+        assert cache.get("a") == (True, True)
+        clock.now = 10
+        assert cache.get("a") == (False, None)
+        assert cache.info().expirations == 1
+        assert cache.info().current_bytes == 0
+
+    def test_large_input_hashed_key(self):
+        cache = PalindromeCache(hash_threshold=8)
+        key = cache.make_key("x" * 1000)
+        assert isinstance(key, tuple) and key[:2] == ('str', 1000)
+        assert cache.make_key("short") == "short"
+        assert cache.make_key("x" * 1000) == key
+        assert cache.make_key("x" * 999 + "y") != key
+
+    def test_invalid_maxsize(self):
+        with pytest.raises(ValueError):
+            PalindromeCache(maxsize=0)
+
+
+class TestMemoize:
+    # 测试函数包装
+
+    def test_results_and_counters(self):
+        cached = memoize(is_palindrome_with_whitespace, maxsize=8)
+        assert cached("A man, a plan, a canal: Panama") is True
+        assert cached("A man, a plan, a canal: Panama") is True
+        assert cached("hello") is False
+        info = cached.cache_info()
+        assert (info.hits, info.misses) == (1, 2)
+        cached.cache_clear()
+        assert cached.cache_info().currsize == 0
+
+    def test_decorator_form_and_large_input(self):
+        calls = []
+
+        @memoize(maxsize=4, hash_threshold=16)
+        def check(text):
+            calls.append(text)
+            return text == text[::-1]
+
+        text = "ab" * 100 + "ba" * 100
+        assert check(text) is True
+        assert check(text) is True
+        assert len(calls) == 1
+
+    def test_stats_copy_per_call(self):
+        # 命中时返回新的副本，调用方修改结果不影响缓存和其他调用方
+        cached = memoize(palindrome_stats)
+        first = cached("Level")
+        first['ignore_case'] = None
+        first.clear()
+        second = cached("Level")
+        third = cached("Level")
+        assert second is not third
+        second['length'] = -1
+        assert third == palindrome_stats("Level") and third['ignore_case'] is True
+        assert cached.cache_info().hits == 2
+
+    def test_bytes_stats_size(self):
+        # 字节输入的统计结果按缓冲区长度计入内存
+        cached = memoize(palindrome_stats)
+        data = b"ab" * 5000
+        assert cached(data)['length'] == len(data)
+        assert cached.cache_info().current_bytes > 2 * len(data)
+
+    def test_invalid_input_not_cached(self):
+        cached = memoize(palindrome_stats)
+        with pytest.raises(TypeError):
+            cached(None)
+        assert cached.cache_info().misses == 0
+
+    def test_thread_safety(self):
+        cached = memoize(palindrome_stats, maxsize=16)
+        texts = [f"text{i % 32}" for i in range(2000)]
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(lambda text: cached(text)['length'], texts))
+        assert results == [len(text) for text in texts]
+        info = cached.cache_info()
+        assert info.hits + info.misses == len(texts)
+        assert info.currsize <= 16
+
+
+class TestCachedFunctions:
+    # 测试按函数配置缓存
+
+    def test_per_function_config(self):
+        api = cached_functions({'palindrome_stats': {'maxsize': 2},
+                                'is_palindrome_simple': None}, maxsize=64)
+        assert api['palindrome_stats'].cache.maxsize == 2
+        assert api['is_palindrome_ignore_case'].cache.maxsize == 64
+        assert not hasattr(api['is_palindrome_simple'], 'cache')
+        assert api['palindrome_stats']("Level")['ignore_case'] is True
+
+    def test_unknown_function(self):
+        with pytest.raises(ValueError):
+            cached_functions({'eval': {}})
@@ -0,0 +1,83 @@
+import csv
+import io
+import json
+
+import pytest
+from src.palindrome import is_palindrome_simple, is_palindrome_with_whitespace
+from src.palindrome_cli import CorpusScanner, main, split_shards
+
+
+LINES = ["racecar", "hello", "", "A man, a plan, a canal: Panama", "上海自来水来自海上",
+         "Level", "ab\r", "x" * 100]
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    # 提供一个按行组织的小语料文件
+    path = tmp_path / "corpus.txt"
+    path.write_bytes(("\n".join(LINES) + "\n").encode("utf-8"))
+    return path
+
+
+class TestSplitShards:
+    # 测试按字节偏移切分文件
+
+    @pytest.mark.parametrize("shard_size", [1, 7, 16, 1000])
+    def test_shards_cover_file_on_line_boundaries(self, corpus, shard_size):
+        data = corpus.read_bytes()
+        shards = split_shards(corpus, shard_size)
+        assert shards[0][0] == 0
+        assert shards[-1][1] == len(data)
+        for (_, end), (start, _) in zip(shards, shards[1:]):
+            assert end == start
+            assert data[end - 1:end] == b"\n"
+
+    def test_invalid_shard_size(self, corpus):
+        with pytest.raises(ValueError):
+            split_shards(corpus, 0)
+
+
+class TestCorpusScanner:
+    # 测试多进程扫描
+
+    @pytest.mark.parametrize("workers, shard_size", [(1, 1 << 20), (1, 5), (2, 5)])
+    def test_results_in_order(self, corpus, workers, shard_size):
+        scanner = CorpusScanner(mode='with_whitespace', workers=workers, shard_size=shard_size)
+        records = list(scanner.scan([corpus, corpus]))
+        expected = [is_palindrome_with_whitespace(line.rstrip("\r")) for line in LINES] * 2
+        assert [result for _, _, _, result in records] == expected
+        assert [line for _, line, _, _ in records] == list(range(1, len(LINES) + 1)) * 2
+        assert scanner.lines == 2 * len(LINES)
+        assert scanner.bytes == 2 * corpus.stat().st_size
+
+    def test_offsets_point_to_lines(self, corpus):
+        data = corpus.read_bytes()
+        for _, _, offset, _ in CorpusScanner(workers=1, shard_size=3).scan([corpus]):
+            assert offset == 0 or data[offset - 1:offset] == b"\n"
+
+    def test_invalid_mode(self):
+        with pytest.raises(ValueError):
+            CorpusScanner(mode='recursive')
+
+
+class TestMain:
+    # 测试命令行入口
+
+    def test_jsonl_output(self, corpus, tmp_path, capsys):
+        output = tmp_path / "result.jsonl"
+        assert main([str(corpus), "--workers", "2", "--shard-size", "8", "-o", str(output)]) == 0
+        rows = [json.loads(line) for line in output.read_text(encoding="utf-8").splitlines()]
+        assert [row["result"] for row in rows] == [
+            is_palindrome_simple(line.rstrip("\r")) for line in LINES]
+        assert "行/秒" in capsys.readouterr().err
+
+    def test_csv_output(self, corpus, monkeypatch, capsys):
+        stdout = io.StringIO()
+        monkeypatch.setattr("sys.stdout", stdout)
+        assert main([str(corpus), "--workers", "1", "--format", "csv",
+                     "--mode", "ignore_case", "--quiet"]) == 0
+        rows = list(csv.reader(io.StringIO(stdout.getvalue())))
+        assert rows[0] == ["file", "line", "offset", "result"]
+        assert len(rows) == len(LINES) + 1
+        assert rows[6][3] == "1"
+        assert capsys.readouterr().err == ""
@@ -0,0 +1,131 @@
+import os
+import random
+
+import pytest
+from src.palindrome import CompactPalindromeStats, PalindromeFlag, PalindromeIndex
+from src.palindrome_disk_index import (
+    PalindromeDiskIndex,
+    build_index,
+    build_index_from_file,
+    load_or_build,
+)
+
+
+RECORDS = ["racecar", "hello", "", "A man, a plan, a canal: Panama", "上海自来水来自海上",
+           "Level", "xabbay", "ΣΑΣ"]
+
+
+@pytest.fixture
+def index_path(tmp_path):
+    path = tmp_path / "corpus.palidx"
+    build_index(RECORDS, path)
+    return path
+
+
+class TestBuildAndQuery:
+    # 测试索引的构建与查询
+
+    def test_stats_match_in_memory(self, index_path):
+        with PalindromeDiskIndex(index_path) as index:
+            assert len(index) == len(RECORDS)
+            for record, stats in zip(RECORDS, index):
+                expected = CompactPalindromeStats.from_text(record)
+                assert (stats.length, stats.flags) == (expected.length, expected.flags)
+            assert index[3]['with_whitespace'] and not index[3]['simple']
+
+    def test_substring_queries(self, index_path):
+        rng = random.Random(18)
+        with PalindromeDiskIndex(index_path) as index:
+            for number, record in enumerate(RECORDS):
+                expected = PalindromeIndex(record)
+                for _ in range(50):
+                    start, end = rng.randint(-3, 12), rng.randint(-3, 12)
+                    assert index.is_palindrome(number, start, end) is expected.is_palindrome(start, end)
+            assert index.is_palindrome(6, 1, 5)
+
+    def test_count(self, index_path):
+        with PalindromeDiskIndex(index_path) as index:
+            assert index.count(PalindromeFlag.EMPTY) == 1
+            assert index.count(PalindromeFlag.SIMPLE) == sum(r == r[::-1] for r in RECORDS)
+
+    def test_bytes_records(self, tmp_path):
+        path = tmp_path / "bytes.palidx"
+        assert build_index([b"abba", bytearray(b"abc")], path) == 2
+        with PalindromeDiskIndex(path) as index:
+            assert index[0]['simple'] and not index[1]['simple']
+            assert index.is_palindrome(1, 1, 2)
+
+    def test_empty_index(self, tmp_path):
+        path = tmp_path / "empty.palidx"
+        build_index([], path)
+        with PalindromeDiskIndex(path) as index:
+            assert len(index) == 0
+            assert list(index) == []
+
+
+class TestFileFormat:
+    # 测试文件头校验与过期检测
+
+    def test_rejects_foreign_files(self, tmp_path):
+        path = tmp_path / "other.bin"
+        path.write_bytes(b"not an index" * 10)
+        with pytest.raises(ValueError):
+            PalindromeDiskIndex(path)
+        path.write_bytes(b"short")
+        with pytest.raises(ValueError):
+            PalindromeDiskIndex(path)
+
+    def test_rejects_unknown_version(self, index_path):
+        data = bytearray(index_path.read_bytes())
+        data[8] = 99
+        index_path.write_bytes(bytes(data))
+        with pytest.raises(ValueError, match="版本"):
+            PalindromeDiskIndex(index_path)
+
+    @pytest.mark.parametrize("keep", [64, 100, -9, -1])
+    def test_rejects_truncated_index(self, index_path, keep):
+        # 截断的索引文件抛出 ValueError，而不是在读取各个表时出错
+        index_path.write_bytes(index_path.read_bytes()[:keep])
+        with pytest.raises(ValueError, match="损坏"):
+            PalindromeDiskIndex(index_path)
+
+    def test_load_or_build_rebuilds_truncated_index(self, tmp_path):
+        corpus = tmp_path / "corpus.txt"
+        corpus.write_bytes(b"abba\nabc\n")
+        path = tmp_path / "corpus.palidx"
+        build_index_from_file(corpus, path)
+        path.write_bytes(path.read_bytes()[:-8])
+        with load_or_build(corpus, path) as index:
+            assert len(index) == 2 and index[0]['simple']
+
+    def test_failed_build_removes_temporary_file(self, tmp_path):
+        path = tmp_path / "corpus.palidx"
+        with pytest.raises(TypeError):
+            build_index(["abba", 123], path)
+        assert not os.path.exists(f"{path}.tmp") and not os.path.exists(path)
+
+    def test_load_or_build_reuses_fresh_index(self, tmp_path):
+        corpus = tmp_path / "corpus.txt"
+        corpus.write_bytes(("\n".join(RECORDS) + "\n").encode("utf-8"))
+        path = tmp_path / "corpus.palidx"
+        with load_or_build(corpus, path) as index:
+            assert len(index) == len(RECORDS)
+        built_at = os.stat(path).st_mtime_ns
+
+        with load_or_build(corpus, path) as index:
+            assert not index.is_stale(corpus)
+        assert os.stat(path).st_mtime_ns == built_at
+
+        corpus.write_bytes(b"abba\r\nabc\n")
+        with load_or_build(corpus, path) as index:
+            assert len(index) == 2
+            assert index[0]['simple'] and index[0].length == 4
+
+    def test_build_from_file_records_source(self, tmp_path):
+        corpus = tmp_path / "corpus.txt"
+        corpus.write_bytes(b"aba\nxyz")
+        path = tmp_path / "corpus.palidx"
+        assert build_index_from_file(corpus, path) == 2
+        with PalindromeDiskIndex(path) as index:
+            assert index.source_size == 7
+            assert not index.is_stale(corpus)
@@ -37,6 +37,7 @@ def reset_admin_password(db_path, target_password="88888888"):
             cursor.execute(create_sql, (target_password,))
             conn.commit()
             print(f"✅ 已自动创建admin用户，密码：{target_password}")
+        # users表上的触发器会更新users_generation，运行中的Flask应用据此清除缓存的admin记录
 
     except OperationalError as e:
         print(f"❌ 执行失败：{str(e)}")
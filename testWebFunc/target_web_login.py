@@ -1,46 +1,570 @@
-from flask import Flask, render_template, request, redirect, url_for, session, make_response, flash
+from flask import Flask, render_template, request, redirect, url_for, session, make_response, flash, g, jsonify
+import base64
+import hashlib
+import heapq
+import hmac
+import os
+import queue
 import random
 import string
 import sqlite3
-from datetime import datetime
+import threading
+import time
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+
+from werkzeug.middleware.proxy_fix import ProxyFix
 
 app = Flask(__name__)
 app.secret_key = "flask_login_demo_2024"
 DATABASE = "user.db"
 
-# 全局变量：存储重置验证码（实验环境简化
-reset_verification_codes = {}  # 格式：{username: (code, expire_time)}
+# 连接池配置：最多保留的空闲连接数、mmap 映射大小、每个连接缓存的预编译语句数
+DB_POOL_SIZE = 8
+DB_MMAP_SIZE = 64 * 1024 * 1024
+DB_CACHED_STATEMENTS = 128
+DB_BUSY_TIMEOUT_MS = 5000
+
+
+class ConnectionPool:
+    """SQLite 连接池：连接复用，避免每次请求都打开/关闭数据库文件"""
+
+    def __init__(self, database, size=DB_POOL_SIZE):
+        self.database = database
+        # 后进先出，优先复用最近用过的连接（页缓存更热）
+        self._idle = queue.LifoQueue(maxsize=size)
+
+    def _connect(self):
+        # 连接可能在不同线程间复用，但同一时刻只借给一个请求
+        conn = sqlite3.connect(self.database, check_same_thread=False,
+                               cached_statements=DB_CACHED_STATEMENTS)
+        conn.row_factory = sqlite3.Row
+        # WAL 模式下读写互不阻塞；synchronous=NORMAL 在 WAL 下仍能保证数据库不损坏
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute(f'PRAGMA mmap_size={DB_MMAP_SIZE}')
+        conn.execute(f'PRAGMA busy_timeout={DB_BUSY_TIMEOUT_MS}')
+        return conn
+
+    def acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return self._connect()
+
+    def release(self, conn):
+        # 归还前回滚未提交的事务，池满时直接关闭
+        if conn.in_transaction:
+            conn.rollback()
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def close_all(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+db_pool = ConnectionPool(DATABASE)
+
+
+@contextmanager
+def pooled_connection():
+    # 请求之外（启动初始化、脚本）使用：借出一个连接，用完自动归还
+    conn = db_pool.acquire()
+    try:
+        yield conn
+    finally:
+        db_pool.release(conn)
+
 
-# 数据库操作函数（无修改）
 def get_db_connection():
-    conn = sqlite3.connect(DATABASE)
-    conn.row_factory = sqlite3.Row
-    return conn
+    # 每个请求最多借用一个连接，请求结束时在 close_db_connection 中归还
+    if 'db' not in g:
+        g.db = db_pool.acquire()
+    return g.db
+
+
+@app.teardown_appcontext
+def close_db_connection(exception):
+    conn = g.pop('db', None)
+    if conn is not None:
+        db_pool.release(conn)
+
 
 def init_database():
-    conn = get_db_connection()
-    conn.execute('''
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT NOT NULL UNIQUE,
-            password TEXT NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
-    user = conn.execute('SELECT * FROM users WHERE username = ?', ('admin',)).fetchone()
-    if not user:
-        conn.execute('INSERT INTO users (username, password) VALUES (?, ?)',
-                    ('admin', '123456'))
-    conn.commit()
-    conn.close()
+    with pooled_connection() as conn:
+        conn.executescript(RESET_CODES_SCHEMA)
+        conn.executescript(RATE_BUCKETS_SCHEMA)
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS users (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                username TEXT NOT NULL UNIQUE,
+                password TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        conn.executescript(USERS_GENERATION_SCHEMA)
+        user = conn.execute('SELECT * FROM users WHERE username = ?', ('admin',)).fetchone()
+        if not user:
+            conn.execute('INSERT INTO users (username, password) VALUES (?, ?)',
+                        ('admin', '123456'))
+        conn.commit()
+
+# 用户记录缓存配置：最多缓存的用户数、缓存有效期（秒）
+USER_CACHE_SIZE = 1024
+USER_CACHE_TTL = 60
+
+# 用户表版本号：users 表上的触发器在每次写入后加一，其他进程（如 resetPassword.py）修改时同样生效
+USERS_GENERATION_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS users_generation (
+        id INTEGER PRIMARY KEY CHECK (id = 0),
+        generation INTEGER NOT NULL
+    );
+    INSERT OR IGNORE INTO users_generation (id, generation) VALUES (0, 0);
+    CREATE TRIGGER IF NOT EXISTS users_generation_insert AFTER INSERT ON users
+    BEGIN UPDATE users_generation SET generation = generation + 1; END;
+    CREATE TRIGGER IF NOT EXISTS users_generation_update AFTER UPDATE ON users
+    BEGIN UPDATE users_generation SET generation = generation + 1; END;
+    CREATE TRIGGER IF NOT EXISTS users_generation_delete AFTER DELETE ON users
+    BEGIN UPDATE users_generation SET generation = generation + 1; END;
+'''
+
+
+class UsersGeneration:
+    """
+    读取用户表版本号。专用连接上的 PRAGMA data_version 只在其他连接（包括其他进程）提交后才变化，
+    没有变化时直接返回上次读到的版本号，不查询表；
+    版本号表和触发器在首次使用时创建（flask run / gunicorn 启动时不会执行 init_database）
+    """
+
+    def __init__(self, database):
+        self.database = database
+        self._conn = None
+        self._schema_ready = False
+        self._data_version = None
+        self._generation = None
+        self._lock = threading.Lock()
+
+    def _ensure_schema(self):
+        # 放在一个事务中执行，users 表还不存在时整体回滚，下次调用时重试
+        try:
+            self._conn.executescript(f'BEGIN; {USERS_GENERATION_SCHEMA} COMMIT;')
+        except sqlite3.OperationalError:
+            if self._conn.in_transaction:
+                self._conn.rollback()
+            return
+        self._schema_ready = True
+
+    def __call__(self):
+        with self._lock:
+            if self._conn is None:
+                self._conn = sqlite3.connect(self.database, check_same_thread=False)
+            if not self._schema_ready:
+                self._ensure_schema()
+            data_version = self._conn.execute('PRAGMA data_version').fetchone()[0]
+            if data_version != self._data_version:
+                try:
+                    row = self._conn.execute('SELECT generation FROM users_generation').fetchone()
+                except sqlite3.OperationalError:
+                    # users 表创建之前版本号表也不存在
+                    row = None
+                self._generation = row[0] if row else None
+                self._data_version = data_version
+            return self._generation
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+                self._schema_ready = False
+                self._data_version = None
+
+
+class UserCache:
+    """
+    按用户名缓存用户记录（LRU + TTL），不存在的用户也会缓存，避免反复查询数据库
+    本进程修改密码后调用 invalidate；generation 返回用户表版本号，
+    版本号变化说明用户表被修改过（可能来自其他进程），此时清空全部缓存
+    """
+
+    def __init__(self, maxsize=USER_CACHE_SIZE, ttl=USER_CACHE_TTL, generation=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()  # 格式：{username: (user, expire_time)}
+        self._lock = threading.Lock()
+        self._generation = generation
+        self._seen_generation = None
+        self.hits = self.misses = self.evictions = self.expirations = self.invalidations = 0
+
+    def get(self, username):
+        # 返回 (是否命中, 用户记录)，用户记录为 None 表示该用户不存在
+        generation = self._generation() if self._generation else None
+        with self._lock:
+            if generation != self._seen_generation:
+                self.invalidations += len(self._entries)
+                self._entries.clear()
+                self._seen_generation = generation
+            entry = self._entries.get(username)
+            if entry is not None:
+                if entry[1] > time.monotonic():
+                    self._entries.move_to_end(username)
+                    self.hits += 1
+                    return True, entry[0]
+                del self._entries[username]
+                self.expirations += 1
+            self.misses += 1
+            return False, None
+
+    def put(self, username, user):
+        with self._lock:
+            self._entries[username] = (user, time.monotonic() + self.ttl)
+            self._entries.move_to_end(username)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, username=None):
+        # 清除指定用户的缓存；不指定时清空全部
+        with self._lock:
+            if username is None:
+                self.invalidations += len(self._entries)
+                self._entries.clear()
+            elif self._entries.pop(username, None) is not None:
+                self.invalidations += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+                'generation': self._seen_generation,
+            }
+
+
+user_cache = UserCache(generation=UsersGeneration(DATABASE))
+
+# 重置验证码有效期（秒）；存储后端：memory（单进程）或 sqlite（多个 worker 进程共享）
+RESET_CODE_TTL = 300
+RESET_CODE_STORE = os.environ.get('RESET_CODE_STORE', 'memory')
+
+RESET_CODES_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS reset_codes (
+        username TEXT PRIMARY KEY,
+        code TEXT NOT NULL,
+        expire_time REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_reset_codes_expire ON reset_codes (expire_time);
+'''
+
+
+class MemoryCodeStore:
+    """进程内的验证码存储：过期时间放入小顶堆，每次访问时从堆顶清理所有已过期的验证码"""
+
+    def __init__(self):
+        self._codes = {}  # 格式：{username: (code, expire_time)}
+        self._heap = []  # 格式：[(expire_time, username)]
+        self._lock = threading.Lock()
+
+    def _sweep(self, now):
+        while self._heap and self._heap[0][0] <= now:
+            expire_time, username = heapq.heappop(self._heap)
+            entry = self._codes.get(username)
+            # 同一用户重新申请后，旧的堆记录已作废
+            if entry is not None and entry[1] == expire_time:
+                del self._codes[username]
+
+    def set(self, username, code, ttl=RESET_CODE_TTL):
+        now = time.time()
+        with self._lock:
+            self._sweep(now)
+            expire_time = now + ttl
+            self._codes[username] = (code, expire_time)
+            heapq.heappush(self._heap, (expire_time, username))
+
+    def get(self, username):
+        # 返回未过期的验证码，不存在或已过期时返回 None
+        with self._lock:
+            self._sweep(time.time())
+            entry = self._codes.get(username)
+            return entry[0] if entry else None
+
+    def delete(self, username):
+        with self._lock:
+            self._codes.pop(username, None)
+
+    def __len__(self):
+        with self._lock:
+            self._sweep(time.time())
+            return len(self._codes)
+
+
+class SqliteCodeStore:
+    """保存在数据库中的验证码，多个 worker 进程共享；过期记录按 expire_time 索引定期批量删除"""
+
+    SWEEP_INTERVAL = 30
+
+    def __init__(self, connect=get_db_connection):
+        self._connect = connect
+        self._table_ready = False
+        self._next_sweep = 0.0
+
+    def _connection(self):
+        conn = self._connect()
+        if not self._table_ready:
+            conn.executescript(RESET_CODES_SCHEMA)
+            self._table_ready = True
+        return conn
+
+    def set(self, username, code, ttl=RESET_CODE_TTL):
+        now = time.time()
+        conn = self._connection()
+        conn.execute('INSERT OR REPLACE INTO reset_codes (username, code, expire_time) VALUES (?, ?, ?)',
+                     (username, code, now + ttl))
+        if now >= self._next_sweep:
+            conn.execute('DELETE FROM reset_codes WHERE expire_time <= ?', (now,))
+            self._next_sweep = now + self.SWEEP_INTERVAL
+        conn.commit()
+
+    def get(self, username):
+        row = self._connection().execute(
+            'SELECT code FROM reset_codes WHERE username = ? AND expire_time > ?',
+            (username, time.time())).fetchone()
+        return row['code'] if row else None
+
+    def delete(self, username):
+        conn = self._connection()
+        conn.execute('DELETE FROM reset_codes WHERE username = ?', (username,))
+        conn.commit()
+
+
+CODE_STORES = {
+    'memory': MemoryCodeStore,
+    'sqlite': SqliteCodeStore,
+}
+
+
+def create_code_store(kind):
+    if kind not in CODE_STORES:
+        raise ValueError(f"不支持的验证码存储后端：{kind}")
+    return CODE_STORES[kind]()
+
+
+reset_code_store = create_code_store(RESET_CODE_STORE)
+
+# 登录 / 找回密码限流：令牌桶容量与每秒补充的令牌数，分别按客户端 IP 和用户名计算
+RATE_LIMITS = {
+    'ip': (30, 30 / 60),
+    'username': (10, 10 / 60),
+}
+# 限流后端：memory（单进程）或 sqlite（多个 worker 进程共享）
+RATE_LIMIT_BACKEND = os.environ.get('RATE_LIMIT_BACKEND', 'memory')
+# 内存后端最多跟踪的令牌桶数，超出时淘汰最久未使用的（相当于重新装满）
+RATE_LIMIT_MAX_BUCKETS = 100000
+
+RATE_BUCKETS_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS rate_buckets (
+        bucket TEXT PRIMARY KEY,
+        tokens REAL NOT NULL,
+        updated_at REAL NOT NULL
+    );
+'''
+
+
+class RateLimiter:
+    """令牌桶限流的公共部分：按端点和维度统计放行 / 拒绝次数"""
+
+    def __init__(self):
+        self._counter_lock = threading.Lock()
+        self.allowed = Counter()  # 格式：{(endpoint, scope): 次数}
+        self.throttled = Counter()
+
+    def allow(self, endpoint, scope, key):
+        capacity, rate = RATE_LIMITS[scope]
+        allowed = self._take(f"{endpoint}:{scope}:{key}", capacity, rate)
+        with self._counter_lock:
+            (self.allowed if allowed else self.throttled)[endpoint, scope] += 1
+        return allowed
+
+    def stats(self):
+        with self._counter_lock:
+            return {
+                'backend': type(self).__name__,
+                'allowed': {f"{endpoint}:{scope}": count for (endpoint, scope), count in self.allowed.items()},
+                'throttled': {f"{endpoint}:{scope}": count for (endpoint, scope), count in self.throttled.items()},
+            }
+
+    @staticmethod
+    def _refill(tokens, updated_at, now, capacity, rate):
+        return min(capacity, tokens + (now - updated_at) * rate)
+
+
+class MemoryRateLimiter(RateLimiter):
+    """进程内令牌桶"""
+
+    def __init__(self, max_buckets=RATE_LIMIT_MAX_BUCKETS):
+        super().__init__()
+        self.max_buckets = max_buckets
+        self._buckets = OrderedDict()  # 格式：{bucket: (tokens, updated_at)}
+        self._lock = threading.Lock()
+
+    def _take(self, bucket, capacity, rate):
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.pop(bucket, (capacity, now))
+            tokens = self._refill(tokens, updated_at, now, capacity, rate)
+            allowed = tokens >= 1
+            self._buckets[bucket] = (tokens - 1 if allowed else tokens, now)
+            if len(self._buckets) > self.max_buckets:
+                self._buckets.popitem(last=False)
+            return allowed
+
+
+class SqliteRateLimiter(RateLimiter):
+    """保存在数据库中的令牌桶，多个 worker 进程共享；已装满的桶定期删除"""
+
+    SWEEP_INTERVAL = 60
+
+    def __init__(self, connect=get_db_connection):
+        super().__init__()
+        self._connect = connect
+        self._table_ready = False
+        self._next_sweep = 0.0
+
+    def _take(self, bucket, capacity, rate):
+        now = time.time()
+        conn = self._connect()
+        if not self._table_ready:
+            conn.executescript(RATE_BUCKETS_SCHEMA)
+            self._table_ready = True
+        # 立即获取写锁，避免多个进程同时读到同一个令牌数
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute('SELECT tokens, updated_at FROM rate_buckets WHERE bucket = ?',
+                               (bucket,)).fetchone()
+            tokens = capacity if row is None else self._refill(row['tokens'], row['updated_at'],
+                                                               now, capacity, rate)
+            allowed = tokens >= 1
+            conn.execute('INSERT OR REPLACE INTO rate_buckets (bucket, tokens, updated_at) VALUES (?, ?, ?)',
+                         (bucket, tokens - 1 if allowed else tokens, now))
+            if now >= self._next_sweep:
+                # 超过最长补满时间未更新的桶已经装满，删除后等价
+                longest = max(capacity / rate for capacity, rate in RATE_LIMITS.values())
+                conn.execute('DELETE FROM rate_buckets WHERE updated_at < ?', (now - longest,))
+                self._next_sweep = now + self.SWEEP_INTERVAL
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        return allowed
+
+
+RATE_LIMITERS = {
+    'memory': MemoryRateLimiter,
+    'sqlite': SqliteRateLimiter,
+}
+
+
+def create_rate_limiter(kind):
+    if kind not in RATE_LIMITERS:
+        raise ValueError(f"不支持的限流后端：{kind}")
+    return RATE_LIMITERS[kind]()
+
+
+rate_limiter = create_rate_limiter(RATE_LIMIT_BACKEND)
+
+# 部署在反向代理 / 负载均衡之后时设为代理层数，按 X-Forwarded-For 取真实客户端 IP；
+# 否则 remote_addr 是代理的地址，验证码令牌绑定和按 IP 限流都会失效（不要在没有代理时开启，X-Forwarded-For 可被伪造）
+TRUSTED_PROXY_HOPS = int(os.environ.get('TRUSTED_PROXY_HOPS', '0'))
+if TRUSTED_PROXY_HOPS:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=TRUSTED_PROXY_HOPS)
+
+def client_address():
+    return request.remote_addr or 'unknown'
+
+def throttle(endpoint, username=None):
+    # 超出频率时返回 429 响应，否则返回 None；不传 username 时按客户端 IP 限流，否则按用户名（忽略大小写）限流
+    # 按用户名限流应放在验证码校验之后，否则任何人随意提交请求就能耗尽该用户名的令牌，把真正的用户锁在外面
+    if username is None:
+        scope, key = 'ip', client_address()
+    else:
+        scope, key = 'username', username.lower()
+    if rate_limiter.allow(endpoint, scope, key):
+        return None
+    _, rate = RATE_LIMITS[scope]
+    retry_after = max(1, int(1 / rate))
+    return "请求过于频繁，请稍后再试", 429, {'Retry-After': str(retry_after)}
 
 def generate_verify_code():
     return ''.join(random.sample(string.ascii_letters + string.digits, 4))
 
+# 验证码模式：session（验证码保存在会话中）或 token（无状态，验证码绑定到表单中的签名令牌，
+# 任意实例都能校验，无需共享会话；令牌绑定客户端 IP，每次请求的登录页都不同，不能被缓存）
+CAPTCHA_MODE = os.environ.get('CAPTCHA_MODE', 'session')
+# 令牌有效期（秒）；令牌无状态，签名绑定申请时的客户端 IP，其他客户端拿到验证码和令牌也无法使用；
+# 同一 IP 在有效期内仍可重复提交，由 /login 的限流约束，因此有效期只需够输入验证码
+CAPTCHA_TOKEN_TTL = 120
+CAPTCHA_SECRET = os.environ.get('CAPTCHA_SECRET', app.secret_key).encode()
+
+def _captcha_signature(code, expire_time, nonce, client):
+    message = f"{code.lower()}|{expire_time}|{nonce}|{client}".encode()
+    digest = hmac.new(CAPTCHA_SECRET, message, hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b'=').decode()
+
+def sign_captcha(code, client, ttl=CAPTCHA_TOKEN_TTL):
+    # 令牌格式：过期时间.随机数.签名（验证码和客户端地址本身不放进令牌）
+    expire_time = int(time.time()) + ttl
+    nonce = base64.urlsafe_b64encode(os.urandom(9)).decode()
+    return f"{expire_time}.{nonce}.{_captcha_signature(code, expire_time, nonce, client)}"
+
+def verify_captcha_token(token, user_input_code, client):
+    # 校验用户输入的验证码与令牌是否匹配、未过期且来自申请令牌的客户端，签名用常量时间比较
+    try:
+        expire_time, nonce, signature = token.split('.')
+        expire_time = int(expire_time)
+    except ValueError:
+        return False
+    if expire_time < time.time():
+        return False
+    expected = _captcha_signature(user_input_code, expire_time, nonce, client)
+    return hmac.compare_digest(signature.encode(), expected.encode())
+
+def issue_captcha():
+    # 生成新验证码，返回 (验证码, 令牌)；session 模式下令牌为 None
+    verify_code = generate_verify_code()
+    if CAPTCHA_MODE == 'token':
+        return verify_code, sign_captcha(verify_code, client_address())
+    session['verify_code'] = verify_code.lower()
+    return verify_code, None
+
+def check_captcha(user_input_code):
+    if CAPTCHA_MODE == 'token':
+        return verify_captcha_token(request.form.get('captchaToken', ''), user_input_code,
+                                    client_address())
+    return hmac.compare_digest(user_input_code.encode(), session.get('verify_code', '').encode())
+
 def get_user_by_username(username):
+    # 先查缓存，未命中再查数据库（记录转换为 dict 后缓存，不引用数据库游标）
+    found, user = user_cache.get(username)
+    if found:
+        return user
     conn = get_db_connection()
-    user = conn.execute('SELECT * FROM users WHERE username = ?', (username,)).fetchone()
-    conn.close()
+    row = conn.execute('SELECT * FROM users WHERE username = ?', (username,)).fetchone()
+    user = dict(row) if row else None
+    user_cache.put(username, user)
     return user
 
 
@@ -49,22 +573,25 @@ def get_user_by_username(username):
 def login():
     error_msg = ""
     verify_code = ""
+    captcha_token = None
 
     if request.method == 'GET':
         # 只有GET请求（首次访问/刷新）才生成新验证码
-        verify_code = generate_verify_code()
-        session['verify_code'] = verify_code.lower()
+        verify_code, captcha_token = issue_captcha()
         # 读取Cookie中的账号密码
         saved_username = request.cookies.get('saved_username', '')
         saved_password = request.cookies.get('saved_password', '')
         return render_template('login.html',
                                verify_code=verify_code,
+                               captcha_token=captcha_token,
                                error_msg=error_msg,
                                saved_username=saved_username,
                                saved_password=saved_password)
     else:  # POST请求（提交登录表单）
-        # 沿用之前生成的验证码（不重新生成）
-        verify_code = session.get('verify_code', '')
+        # 先按 IP 限流，被拒绝的请求不做验证码校验和数据库查询
+        throttled = throttle('login')
+        if throttled:
+            return throttled
         saved_username = request.cookies.get('saved_username', '')
         saved_password = request.cookies.get('saved_password', '')
 
@@ -83,9 +610,13 @@ def login():
             print(f"触发密码为空验证，error_msg：{error_msg}")  # 调试用：打印error_msg
         elif not user_input_code.strip():
             error_msg = "请输入验证码"
-        elif user_input_code != session['verify_code']:
+        elif not check_captcha(user_input_code):
             error_msg = "验证码错误，请重新输入"
         else:
+            # 验证码通过后再按用户名限流（在数据库查询之前）
+            throttled = throttle('login', username)
+            if throttled:
+                return throttled
             user = get_user_by_username(username)
             if not user:
                 error_msg = "用户名或密码错误"
@@ -103,9 +634,15 @@ def login():
                 session['current_user'] = username
                 return response
 
-        # POST失败，返回原页面（验证码不变）
+        # POST失败，返回原页面（session 模式下验证码不变；token 模式下令牌不保存验证码，重新生成）
+        if CAPTCHA_MODE == 'token':
+            verify_code, captcha_token = issue_captcha()
+        else:
+            # 沿用之前生成的验证码（不重新生成）
+            verify_code = session.get('verify_code', '')
         return render_template('login.html',
                                verify_code=verify_code,
+                               captcha_token=captcha_token,
                                error_msg=error_msg or "",  # 确保不为None
                                saved_username=saved_username,
                                saved_password=saved_password)
@@ -134,6 +671,11 @@ def logout():
 def forgot_password():
     if request.method == 'POST':
         username = request.form.get('reset_username').strip()
+        throttled = throttle('forgot_password')
+        if not throttled and username:
+            throttled = throttle('forgot_password', username)
+        if throttled:
+            return throttled
         # 验证用户是否存在
         user = get_user_by_username(username)
         if not user:
@@ -142,7 +684,7 @@ def forgot_password():
         # 生成6位数字重置验证码（实验简化，实际需发邮件/短信）
         reset_code = ''.join(random.sample(string.digits, 6))
         # 存储验证码（有效期5分钟）
-        reset_verification_codes[username] = (reset_code, datetime.now().timestamp() + 300)
+        reset_code_store.set(username, reset_code, RESET_CODE_TTL)
         print(f"【重置验证码】用户{username}：{reset_code}（5分钟内有效）")
         # 跳转至验证码输入页面
         session['reset_username'] = username
@@ -158,15 +700,10 @@ def verify_reset_code():
         return redirect(url_for('forgot_password'))
     if request.method == 'POST':
         input_code = request.form.get('reset_code').strip()
-        # 验证验证码
-        code_info = reset_verification_codes.get(username)
-        if not code_info:
-            flash("验证码已过期，请重新申请")
-            return render_template('verify_reset_code.html')
-        code, expire_time = code_info
-        if datetime.now().timestamp() > expire_time:
+        # 验证验证码（过期的验证码由存储自动清除）
+        code = reset_code_store.get(username)
+        if code is None:
             flash("验证码已过期，请重新申请")
-            del reset_verification_codes[username]
             return render_template('verify_reset_code.html')
         if input_code != code:
             flash("验证码错误")
@@ -196,15 +733,22 @@ def reset_password():
         conn = get_db_connection()
         conn.execute('UPDATE users SET password = ? WHERE username = ?', (new_pwd, username))
         conn.commit()
-        conn.close()
+        user_cache.invalidate(username)
         # 清除临时数据
         session.pop('reset_username', None)
-        reset_verification_codes.pop(username, None)
+        reset_code_store.delete(username)
         flash("密码重置成功，请用新密码登录")
         return redirect(url_for('login'))
     # GET请求：显示重置密码页面
     return render_template('reset_password.html')
 
+# 运行状态统计（登录后可查看），用于调整缓存大小
+@app.route('/internal/stats')
+def internal_stats():
+    if not session.get('current_user'):
+        return redirect(url_for('login'))
+    return jsonify({'user_cache': user_cache.stats(), 'rate_limit': rate_limiter.stats()})
+
 if __name__ == '__main__':
     init_database()
     app.run(debug=True)
\ No newline at end of file
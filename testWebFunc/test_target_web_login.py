@@ -0,0 +1,280 @@
+import os
+import re
+import sqlite3
+import subprocess
+import sys
+
+import pytest
+
+import target_web_login as web
+
+RESET_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "resetPassword.py")
+
+
+# 使用临时数据库的应用（连接池、用户缓存、验证码存储、限流器都替换为新实例）
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    path = str(tmp_path / "user.db")
+    pool = web.ConnectionPool(path)
+    generation = web.UsersGeneration(path)
+    monkeypatch.setattr(web, 'DATABASE', path)
+    monkeypatch.setattr(web, 'db_pool', pool)
+    monkeypatch.setattr(web, 'user_cache', web.UserCache(generation=generation))
+    monkeypatch.setattr(web, 'reset_code_store', web.MemoryCodeStore())
+    monkeypatch.setattr(web, 'rate_limiter', web.MemoryRateLimiter())
+    web.init_database()
+    yield path
+    generation.close()
+    pool.close_all()
+
+
+@pytest.fixture
+def client(database):
+    web.app.config['TESTING'] = True
+    with web.app.test_client() as client:
+        yield client
+
+
+# 手动控制的时钟，替换 time.monotonic / time.time
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(web.time, 'monotonic', lambda: now[0])
+    monkeypatch.setattr(web.time, 'time', lambda: now[0])
+    return now
+
+
+def login(client, username, password):
+    # session 模式：直接写入验证码，返回登录请求的响应
+    with client.session_transaction() as sess:
+        sess['verify_code'] = 'abcd'
+    return client.post('/login', data={'username': username, 'password': password, 'verifyCode': 'ABCD'})
+
+
+def reset_password(client, username, new_password):
+    # 走完整的找回密码流程
+    client.post('/forgot_password', data={'reset_username': username})
+    code = web.reset_code_store.get(username)
+    client.post('/verify_reset_code', data={'reset_code': code})
+    return client.post('/reset_password', data={'new_password': new_password,
+                                                'confirm_password': new_password})
+
+
+# 用例1：LRU 淘汰最久未使用的用户，TTL 到期后重新查询
+def test_user_cache_lru_and_ttl(clock):
+    cache = web.UserCache(maxsize=2, ttl=60)
+    cache.put('a', {'username': 'a'})
+    cache.put('b', {'username': 'b'})
+    assert cache.get('a') == (True, {'username': 'a'})
+    cache.put('c', {'username': 'c'})
+    assert cache.get('b') == (False, None)
+    assert cache.get('a')[0] and cache.get('c')[0]
+
+    clock[0] += 61
+    assert cache.get('a') == (False, None)
+    stats = cache.stats()
+    assert (stats['evictions'], stats['expirations'], stats['size']) == (1, 1, 1)
+    assert (stats['hits'], stats['misses']) == (3, 2)
+
+
+# 用例2：不存在的用户名也会缓存，第二次查询不访问数据库
+def test_unknown_username_cached(client):
+    with web.app.app_context():
+        assert web.get_user_by_username('ghost') is None
+        assert web.get_user_by_username('ghost') is None
+    assert web.user_cache.get('ghost') == (True, None)
+    stats = web.user_cache.stats()
+    assert stats['misses'] == 1 and stats['hits'] == 2
+
+
+# 用例3：/reset_password 修改密码后立即清除缓存
+def test_reset_password_invalidates_cache(client):
+    assert login(client, 'admin', '123456').status_code == 302
+    assert web.user_cache.get('admin')[0]
+    assert reset_password(client, 'admin', 'n3w-pass').status_code == 302
+    assert web.user_cache.stats()['invalidations'] >= 1
+    assert login(client, 'admin', '123456').status_code == 200
+    assert login(client, 'admin', 'n3w-pass').status_code == 302
+
+
+# 用例4：/internal/stats 返回缓存计数（需要登录）
+def test_internal_stats_counters(client):
+    assert client.get('/internal/stats').status_code == 302
+    login(client, 'admin', '123456')
+    login(client, 'admin', '123456')
+    stats = client.get('/internal/stats').get_json()
+    cache = stats['user_cache']
+    assert (cache['misses'], cache['hits'], cache['size']) == (1, 1, 1)
+    assert cache['hit_rate'] == 0.5
+    assert stats['rate_limit']['allowed']['login:ip'] == 2
+
+
+# 用例5：在其他进程中运行 resetPassword.py 后，缓存的旧密码不再有效
+def test_reset_script_in_other_process_invalidates_cache(client, database):
+    assert login(client, 'admin', '123456').status_code == 302
+    assert web.user_cache.get('admin')[0]
+
+    subprocess.run([sys.executable, RESET_SCRIPT], cwd=os.path.dirname(database), check=True,
+                   capture_output=True)
+
+    assert login(client, 'admin', '123456').status_code == 200
+    assert login(client, 'admin', '88888888').status_code == 302
+    assert web.user_cache.stats()['generation'] == 2
+
+
+# 用例6：没有执行 init_database 的数据库（只有 users 表）首次使用时创建版本号表和触发器
+def test_users_generation_creates_schema_lazily(tmp_path):
+    path = str(tmp_path / "user.db")
+    generation = web.UsersGeneration(path)
+    assert generation() is None
+
+    conn = sqlite3.connect(path)
+    conn.execute('CREATE TABLE users (id INTEGER PRIMARY KEY, username TEXT, password TEXT)')
+    conn.commit()
+    assert generation() == 0
+    conn.execute("INSERT INTO users (username, password) VALUES ('admin', '123456')")
+    conn.commit()
+    assert generation() == 1
+    conn.close()
+    generation.close()
+
+
+# 用例7：内存验证码存储按过期时间清理，重新申请会替换旧验证码
+def test_memory_code_store_sweep_and_replace(clock):
+    store = web.MemoryCodeStore()
+    store.set('alice', '111111', ttl=10)
+    store.set('bob', '222222', ttl=30)
+    clock[0] += 5
+    store.set('alice', '333333', ttl=10)
+    assert store.get('alice') == '333333' and len(store) == 2
+
+    # alice 的旧堆记录到期时不会删除新验证码
+    clock[0] += 6
+    assert store.get('alice') == '333333'
+    assert len(store._heap) == 2
+
+    clock[0] += 5
+    assert store.get('alice') is None
+    assert store.get('bob') == '222222'
+    clock[0] += 20
+    assert len(store) == 0 and store._heap == []
+
+    store.set('carol', '444444')
+    store.delete('carol')
+    assert store.get('carol') is None
+
+
+# 用例8：数据库验证码存储过期后不可用，并按间隔批量删除过期记录
+def test_sqlite_code_store_expiry(database, clock):
+    with web.pooled_connection() as conn:
+        store = web.SqliteCodeStore(connect=lambda: conn)
+        store.set('alice', '111111', ttl=10)
+        store.set('alice', '222222', ttl=10)
+        assert store.get('alice') == '222222'
+
+        clock[0] += 11
+        assert store.get('alice') is None
+        count = 'SELECT COUNT(*) FROM reset_codes'
+        assert conn.execute(count).fetchone()[0] == 1
+
+        # 距上次清理超过 SWEEP_INTERVAL 后，下一次写入删除过期记录
+        clock[0] += store.SWEEP_INTERVAL
+        store.set('bob', '333333', ttl=10)
+        assert conn.execute(count).fetchone()[0] == 1
+        assert store.get('bob') == '333333'
+        store.delete('bob')
+        assert store.get('bob') is None
+
+
+# 用例9：验证码令牌绑定客户端 IP 并在有效期后失效
+def test_captcha_token_bound_to_client(clock):
+    token = web.sign_captcha('AbCd', '10.0.0.1')
+    assert web.verify_captcha_token(token, 'abcd', '10.0.0.1')
+    assert not web.verify_captcha_token(token, 'abcd', '10.0.0.2')
+    assert not web.verify_captcha_token(token, 'abce', '10.0.0.1')
+    assert not web.verify_captcha_token('not-a-token', 'abcd', '10.0.0.1')
+    clock[0] += web.CAPTCHA_TOKEN_TTL + 1
+    assert not web.verify_captcha_token(token, 'abcd', '10.0.0.1')
+
+
+# 用例10：token 模式下，其他客户端重放已解出的验证码和令牌会失败
+def test_captcha_token_replay_from_other_client(client, monkeypatch):
+    monkeypatch.setattr(web, 'CAPTCHA_MODE', 'token')
+    monkeypatch.setattr(web, 'generate_verify_code', lambda: 'AbCd')
+    page = client.get('/login', environ_base={'REMOTE_ADDR': '10.0.0.1'}).get_data(as_text=True)
+    token = re.search(r'name="captchaToken" value="([^"]+)"', page).group(1)
+    form = {'username': 'admin', 'password': '123456', 'verifyCode': 'abcd', 'captchaToken': token}
+
+    replay = client.post('/login', data=form, environ_base={'REMOTE_ADDR': '10.0.0.2'})
+    assert replay.status_code == 200
+    assert "验证码错误" in replay.get_data(as_text=True)
+    assert client.post('/login', data=form, environ_base={'REMOTE_ADDR': '10.0.0.1'}).status_code == 302
+
+
+# 用例11：在代理之后按 X-Forwarded-For 识别客户端，令牌仍然绑定真实客户端
+def test_captcha_token_behind_proxy(client, monkeypatch):
+    monkeypatch.setattr(web, 'CAPTCHA_MODE', 'token')
+    monkeypatch.setattr(web, 'generate_verify_code', lambda: 'AbCd')
+    monkeypatch.setattr(web.app, 'wsgi_app', web.ProxyFix(web.app.wsgi_app, x_for=1))
+    proxy = {'REMOTE_ADDR': '192.168.0.1'}
+    page = client.get('/login', environ_base=proxy, headers={'X-Forwarded-For': '10.0.0.1'})
+    token = re.search(r'name="captchaToken" value="([^"]+)"', page.get_data(as_text=True)).group(1)
+    form = {'username': 'admin', 'password': '123456', 'verifyCode': 'abcd', 'captchaToken': token}
+
+    replay = client.post('/login', data=form, environ_base=proxy, headers={'X-Forwarded-For': '10.0.0.2'})
+    assert "验证码错误" in replay.get_data(as_text=True)
+    response = client.post('/login', data=form, environ_base=proxy, headers={'X-Forwarded-For': '10.0.0.1'})
+    assert response.status_code == 302
+
+
+# 用例12：令牌桶用完后拒绝，按速率补充令牌
+def test_memory_rate_limiter_refill(clock):
+    limiter = web.MemoryRateLimiter()
+    capacity, rate = web.RATE_LIMITS['username']
+    assert all(limiter.allow('login', 'username', 'admin') for _ in range(capacity))
+    assert not limiter.allow('login', 'username', 'admin')
+    # 其他用户名的桶互不影响
+    assert limiter.allow('login', 'username', 'guest')
+
+    clock[0] += 1 / rate
+    assert limiter.allow('login', 'username', 'admin')
+    assert not limiter.allow('login', 'username', 'admin')
+    # 补充的令牌不超过容量
+    clock[0] += 100 * capacity / rate
+    assert sum(limiter.allow('login', 'username', 'admin') for _ in range(capacity + 5)) == capacity
+
+    stats = limiter.stats()
+    assert stats['throttled']['login:username'] == 7
+    assert stats['allowed']['login:username'] == 2 * capacity + 2
+
+
+# 用例13：超出频率的登录请求返回 429 和 Retry-After；验证码错误的请求不消耗用户名的令牌
+def test_login_throttled_with_retry_after(client):
+    capacity, rate = web.RATE_LIMITS['username']
+    junk = {'username': 'admin', 'password': 'x', 'verifyCode': 'zzzz'}
+    for _ in range(capacity + 5):
+        response = client.post('/login', data=junk, environ_base={'REMOTE_ADDR': '10.0.0.9'})
+        assert "验证码错误" in response.get_data(as_text=True)
+    for _ in range(capacity):
+        assert login(client, 'admin', 'wrong-pass').status_code == 200
+    response = login(client, 'admin', '123456')
+    assert response.status_code == 429
+    assert response.headers['Retry-After'] == str(int(1 / rate))
+    # 限流按用户名计算（忽略大小写），其他用户名不受影响
+    assert login(client, 'ADMIN', '123456').status_code == 429
+    assert login(client, 'guest', '123456').status_code == 200
+
+
+# 用例14：数据库限流器的令牌桶在多个连接（多个 worker 进程）之间共享
+def test_sqlite_rate_limiter_shared_between_connections(database, clock):
+    capacity, rate = web.RATE_LIMITS['username']
+    with web.pooled_connection() as first, web.pooled_connection() as second:
+        limiters = [web.SqliteRateLimiter(connect=lambda: first),
+                    web.SqliteRateLimiter(connect=lambda: second)]
+        results = [limiters[i % 2].allow('login', 'username', 'admin') for i in range(capacity + 2)]
+        assert results == [True] * capacity + [False, False]
+
+        clock[0] += 1 / rate
+        assert limiters[1].allow('login', 'username', 'admin')
+        assert not limiters[0].allow('login', 'username', 'admin')
+        assert limiters[0].allow('forgot_password', 'username', 'admin')